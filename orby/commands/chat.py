@@ -9,12 +9,12 @@ from ..core import OrbyApp, ToolCallStatus
 from ..ui.enhanced_ui import ui
 from ..config import load_config, get_sessions_dir
 from ..model_management import model_manager
-from ..memory import memory_system
+from ..memory import get_memory_system
 from ..plugins import plugin_manager
 from ..utils.rag import rag_system
 from ..utils.session import session_manager
 from ..utils.detection import detect_all_local_models
-from ..live_mode import live_mode_manager, live_suggestions
+from ..live_mode import get_live_mode_manager, get_live_suggestions
 
 
 @click.command()
@@ -84,7 +84,7 @@ def chat(model, auto, tui, session):
         ui.console.print("[yellow]Press Enter to continue chatting...[/yellow]")
     
     # Register live mode callback
-    live_suggestions.register_suggestion_callback(live_suggestion_handler)
+    get_live_suggestions().register_suggestion_callback(live_suggestion_handler)
     
     while True:
         try:
@@ -115,7 +115,7 @@ def chat(model, auto, tui, session):
                 status = "enabled" if auto_approve else "disabled"
                 ui.show_success(f"Auto-approve mode {status}")
             elif user_input.strip().lower() == '/reset':
-                memory_system.clear_session_memory()
+                get_memory_system().clear_session_memory()
                 ui.show_success("Conversation history reset")
             elif user_input.strip().lower().startswith('/save '):
                 parts = user_input.strip().split(' ', 1)
@@ -171,11 +171,11 @@ def chat(model, auto, tui, session):
             elif user_input.strip().lower() == '/live':
                 # Toggle live mode
                 if not live_mode_active:
-                    live_mode_manager.start_monitoring()
+                    get_live_mode_manager().start_monitoring()
                     live_mode_active = True
                     ui.show_success("Live mode activated")
                 else:
-                    live_mode_manager.stop_monitoring()
+                    get_live_mode_manager().stop_monitoring()
                     live_mode_active = False
                     ui.show_success("Live mode deactivated")
             elif user_input.strip().lower() == '/tui':
@@ -185,7 +185,7 @@ def chat(model, auto, tui, session):
                 return
             elif user_input.strip().lower() == '/context':
                 # Show current context
-                context = memory_system.get_context()
+                context = get_memory_system().get_context()
                 if context:
                     ui.console.print("[bold blue]Current Context:[/bold blue]")
                     ui.console.print(context)
@@ -220,7 +220,7 @@ def chat(model, auto, tui, session):
                 ui.show_user_message(user_input)
                 
                 # Add to session memory
-                memory_system.add_to_session_memory(f"User: {user_input}")
+                get_memory_system().add_to_session_memory(f"User: {user_input}")
                 
                 # Show loading indicator
                 # asyncio.run(ui.show_loading("Orby is thinking..."))
@@ -237,7 +237,7 @@ def chat(model, auto, tui, session):
                 # Process with agent
                 try:
                     # Add to session memory
-                    memory_system.add_to_session_memory(f"User: {user_input}")
+                    get_memory_system().add_to_session_memory(f"User: {user_input}")
                     
                     response = asyncio.run(app.agent.process_message(enhanced_input))
                     
@@ -245,7 +245,7 @@ def chat(model, auto, tui, session):
                     ui.show_agent_message(response)
                     
                     # Add to session memory
-                    memory_system.add_to_session_memory(f"Orby: {response}")
+                    get_memory_system().add_to_session_memory(f"Orby: {response}")
                     
                     # Add to current session if active
                     if session_manager.current_session:
@@ -271,6 +271,6 @@ def chat(model, auto, tui, session):
     
     # Stop live monitoring if active
     if live_mode_active:
-        live_mode_manager.stop_monitoring()
+        get_live_mode_manager().stop_monitoring()
     
     ui.console.print("\n[blue]Thanks for using Orby![/blue]")
\ No newline at end of file
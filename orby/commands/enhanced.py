@@ -6,10 +6,10 @@ from typing import Dict, List
 from ..model_management import model_manager, ModelInfo
 from ..ui.enhanced_ui import ui
 from ..utils.detection import detect_all_local_models
-from ..memory import memory_system
+from ..memory import get_memory_system
 from ..plugins import plugin_manager
 from ..utils.rag import rag_system
-from ..live_mode import live_mode_manager, live_suggestions
+from ..live_mode import get_live_mode_manager, get_live_suggestions
 from .memory import add_memory_commands
 from .prompt import prompt
 
@@ -109,10 +109,10 @@ def live():
         ui.console.print(f"[bold green]💡 Suggestion:[/bold green] {suggestion}")
     
     # Register the suggestion callback
-    live_suggestions.register_suggestion_callback(suggestion_callback)
+    get_live_suggestions().register_suggestion_callback(suggestion_callback)
     
     # Start monitoring
-    live_mode_manager.start_monitoring()
+    get_live_mode_manager().start_monitoring()
     
     try:
         # Keep running until interrupted
@@ -122,7 +122,7 @@ def live():
             time.sleep(1)
     except KeyboardInterrupt:
         ui.console.print("\n[bold blue]Stopping live mode...[/bold blue]")
-        live_mode_manager.stop_monitoring()
+        get_live_mode_manager().stop_monitoring()
         ui.console.print("[green]Live mode stopped.[/green]")
 
 
@@ -171,6 +171,7 @@ def memory():
     ui.show_header()
     ui.show_status_bar()
     
+    memory_system = get_memory_system()
     session_count = len(memory_system.session_memory)
     persistent_count = len(memory_system.persistent_memory)
     
@@ -188,6 +189,7 @@ def memory():
 def clear_memory():
     """Clear all memory."""
     if ui.show_confirmation("Are you sure you want to clear all memory?"):
+        memory_system = get_memory_system()
         memory_system.clear_session_memory()
         memory_system.clear_persistent_memory()
         ui.show_success("Memory cleared.")
@@ -200,7 +202,7 @@ def context():
     ui.show_status_bar()
     
     # Show current context from memory
-    context_str = memory_system.get_context()
+    context_str = get_memory_system().get_context()
     
     if context_str:
         ui.console.print("[bold green]Current Context:[/bold green]")
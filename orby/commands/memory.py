@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 from rich.table import Table
 from rich.panel import Panel
-from ..memory import memory_system
+from ..memory import get_memory_system
 from ..ui import OrbyUI
 
 
@@ -22,7 +22,7 @@ def stats():
     ui.show_header()
     ui.show_status_bar()
     
-    stats = memory_system.get_memory_stats()
+    stats = get_memory_system().get_memory_stats()
     
     table = Table(title="Memory Statistics", show_header=True, header_style="bold magenta")
     table.add_column("Metric", style="cyan", no_wrap=True)
@@ -62,7 +62,7 @@ def search(query):
         ui.show_error("Please provide a search query")
         return
     
-    results = memory_system.search_session_memory(query_str)
+    results = get_memory_system().search_session_memory(query_str)
     
     if results:
         ui.console.print(f"[bold green]Found {len(results)} results for: {query_str}[/bold green]")
@@ -85,7 +85,7 @@ def list():
     ui.show_status_bar()
     
     # Get the context which includes recent entries
-    context = memory_system.get_context(max_entries=20)
+    context = get_memory_system().get_context(max_entries=20)
     
     if context.strip():
         ui.console.print("[bold green]Recent Memory Entries:[/bold green]")
@@ -100,7 +100,7 @@ def clear():
     ui = OrbyUI()
     
     if ui.show_confirmation("Are you sure you want to clear all memory? This cannot be undone."):
-        memory_system.clear_all_memory()
+        get_memory_system().clear_all_memory()
         ui.show_success("Memory cleared.")
 
 
@@ -110,7 +110,7 @@ def save(session_name):
     """Save current memory session."""
     ui = OrbyUI()
     
-    success = memory_system.save_session_memory(session_name)
+    success = get_memory_system().save_session_memory(session_name)
     if success:
         ui.show_success(f"Memory session saved as: {session_name}")
     else:
@@ -123,7 +123,7 @@ def load(session_name):
     """Load a saved memory session."""
     ui = OrbyUI()
     
-    success = memory_system.load_session_memory(session_name)
+    success = get_memory_system().load_session_memory(session_name)
     if success:
         ui.show_success(f"Memory session loaded: {session_name}")
     else:
@@ -137,7 +137,7 @@ def available():
     ui.show_header()
     ui.show_status_bar()
     
-    sessions = memory_system.get_available_sessions()
+    sessions = get_memory_system().get_available_sessions()
     
     if sessions:
         ui.console.print("[bold green]Available Saved Sessions:[/bold green]")
@@ -154,7 +154,7 @@ def context():
     ui.show_header()
     ui.show_status_bar()
     
-    context = memory_system.get_context()
+    context = get_memory_system().get_context()
     
     if context.strip():
         panel = Panel(
@@ -1,7 +1,45 @@
 """Configuration management for Orby."""
+import copy
+import functools
 import os
 import yaml
 from pathlib import Path
+from typing import Any
+
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
+
+@functools.lru_cache(maxsize=64)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int) -> Any:
+    """Parse a YAML file; cached per (path, mtime, size) so edits are picked up."""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
+
+def load_yaml(path: Path) -> Any:
+    """Load a YAML file, reusing the parsed result while the file is unchanged."""
+    st = path.stat()
+    # Callers mutate the result, so hand out a copy of the cached value
+    return copy.deepcopy(_load_yaml_cached(str(path), st.st_mtime_ns, st.st_size))
+
+
+def save_yaml(data: Any, path: Path):
+    """Atomically write data to a YAML file so readers never see a partial write."""
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    try:
+        with open(tmp_path, 'w') as f:
+            yaml.dump(data, f, Dumper=_SafeDumper, default_flow_style=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    # A rewrite can land within the filesystem's mtime granularity with the same size
+    _load_yaml_cached.cache_clear()
 
 
 def get_config_dir() -> Path:
@@ -24,8 +62,7 @@ def load_config() -> dict:
     config_path = config_dir / 'config.yml'
     
     if config_path.exists():
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f) or {}
+        return load_yaml(config_path) or {}
     else:
         # Return default configuration
         return {
@@ -40,5 +77,4 @@ def save_config(config: dict):
     """Save the configuration to the config file."""
     config_dir = get_config_dir()  # Ensure config directory exists
     config_path = config_dir / 'config.yml'
-    with open(config_path, 'w') as f:
-        yaml.dump(config, f, default_flow_style=False)
\ No newline at end of file
+    save_yaml(config, config_path)
\ No newline at end of file
@@ -1,15 +1,19 @@
 """Enhanced core Orby application logic with agentic capabilities and local AI features."""
 import asyncio
 import json
-from typing import Dict, List, Any, Optional, Callable, AsyncGenerator
-from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable, AsyncGenerator, Sequence
+from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 import yaml
 from datetime import datetime
+import logging
 import time
 
 
+logger = logging.getLogger("orby")
+
+
 class ToolPermission(Enum):
     """Permission levels for tools."""
     DENY = "deny"
@@ -37,7 +41,7 @@ class ToolCall:
     call_id: Optional[str] = None
     timestamp: Optional[datetime] = None
     execution_time: Optional[float] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
 
 
 @dataclass
@@ -45,9 +49,9 @@ class AgentMessage:
     """Represents a message in the conversation with enhanced metadata."""
     role: str  # 'user', 'assistant', 'tool'
     content: str
-    tool_calls: List[ToolCall] = field(default_factory=list)
+    tool_calls: Sequence[ToolCall] = ()
     timestamp: Optional[datetime] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
     model_info: Optional[Dict[str, str]] = None
     timing: Optional[Dict[str, float]] = None
 
@@ -55,11 +59,11 @@ class AgentMessage:
 @dataclass
 class AgentThought:
     """Represents the agent's internal reasoning process."""
-    reasoning_steps: List[str] = field(default_factory=list)
+    reasoning_steps: Sequence[str] = ()
     tool_selection: Optional[str] = None
     confidence: Optional[float] = None
     timestamp: Optional[datetime] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
 
 
 class Tool:
@@ -113,8 +117,8 @@ class Tool:
         """Implementation of tool execution."""
         raise NotImplementedError
     
-    def requires_confirmation(self) -> bool:
-        """Check if this tool requires user confirmation."""
+    def requires_confirmation(self, **kwargs) -> bool:
+        """Check if this tool requires user confirmation for a call with these arguments."""
         return self.is_dangerous
 
 
@@ -165,9 +169,9 @@ class ToolRegistry:
                 self._tool_categories[category].append(tool.name)
                 
             except ImportError as e:
-                print(f"Warning: Could not import {tool_class_name} ({e}), skipping tool")
+                logger.warning("Could not import %s (%s), skipping tool", tool_class_name, e)
             except Exception as e:
-                print(f"Warning: Could not initialize {tool_class_name} ({e}), skipping tool")
+                logger.warning("Could not initialize %s (%s), skipping tool", tool_class_name, e)
     
     def register_tool(self, tool: Tool, category: str = "general"):
         """Register a custom tool."""
@@ -202,11 +206,12 @@ class ToolRegistry:
         """Get permission for a tool."""
         return self._permissions.get(tool_name, ToolPermission.DENY)
     
-    def tool_requires_confirmation(self, tool_name: str) -> bool:
-        """Check if a tool requires user confirmation."""
+    def tool_requires_confirmation(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> bool:
+        """Check if a tool call requires user confirmation."""
         tool = self.get_tool(tool_name)
         if tool:
-            return tool.requires_confirmation()
+            # Pass the call's arguments so e.g. read-only file operations can skip the prompt
+            return tool.requires_confirmation(**(arguments or {}))
         return False
 
 
@@ -286,9 +291,7 @@ class Agent:
             return agent_response
         except Exception as e:
             # If any processing fails, return a helpful error message
-            error_msg = f"Error processing message: {str(e)}"
-            import traceback
-            print(f"Agent processing error: {error_msg}\n{traceback.format_exc()}")
+            logger.warning("Agent processing error: %s", e, exc_info=True)
             return f"Sorry, I encountered an error while processing your request: {str(e)}"
 
     async def _get_enhanced_agent_response(self, user_input: str, context: Optional[str] = None) -> str:
@@ -334,7 +337,22 @@ class Agent:
                 }
                 results.append(error_result)
                 continue
-            
+
+            if self.tools.tool_requires_confirmation(tool_call.name, tool_call.arguments):
+                permission = self.tools.get_tool_permission(tool_call.name)
+                if permission == ToolPermission.DENY:
+                    # Hold the call until the user grants permission for this tool
+                    tool_call.status = ToolCallStatus.CONFIRMING
+                    results.append({
+                        "status": "confirmation_required",
+                        "error": f"Tool '{tool_call.name}' requires confirmation before it can run",
+                        "tool_call": tool_call.name
+                    })
+                    continue
+                if permission == ToolPermission.ALLOW_ONCE:
+                    # A one-off grant is used up by this call
+                    self.tools.set_tool_permission(tool_call.name, ToolPermission.DENY)
+
             try:
                 # Record start time
                 start_time = time.time()
@@ -450,7 +468,7 @@ class OrbyApp:
             self.agent = Agent(model_name=model_name, tools=self.tools, system_prompt=system_prompt)
         except Exception as e:
             # If agent initialization fails, create with minimal configuration
-            print(f"Warning: Agent initialization failed ({e}), creating with defaults")
+            logger.warning("Agent initialization failed (%s), creating with defaults", e)
             self.agent = Agent(model_name=model_name, tools=self.tools)
 
     def get_available_models(self) -> Dict[str, List[str]]:
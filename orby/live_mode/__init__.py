@@ -1,14 +1,43 @@
 """Live mode system for Orby."""
 import asyncio
+import functools
+import os
+import sys
 import threading
+from collections import deque
 from pathlib import Path
 from typing import Dict, List, Callable, Optional
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import (
+    FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent, FileDeletedEvent
+)
 import time
 from datetime import datetime
 
 
+# Event type names passed to callbacks; interned so comparisons are identity checks
+_MODIFIED = sys.intern("modified")
+_CREATED = sys.intern("created")
+_DELETED = sys.intern("deleted")
+
+# The only event types FileChangeHandler acts on. Passing these to the observer
+# lets native backends (inotify on Linux) narrow the kernel watch mask, so open,
+# close and access events in busy trees are never delivered to Python.
+_WATCHED_EVENTS = [FileModifiedEvent, FileCreatedEvent, FileDeletedEvent]
+
+# Suggestion templates keyed by (event_type, file_extension)
+_SUGGESTIONS = {
+    **{(_CREATED, ext): "Consider adding documentation to your new {ext} file: {name}"
+       for ext in ('.py', '.js', '.ts')},
+    (_CREATED, '.md'): "Review your new markdown file for clarity and completeness: {name}",
+    **{(_MODIFIED, ext): "Consider running tests for your updated {ext} file: {name}"
+       for ext in ('.py', '.js', '.ts')},
+    **{(_MODIFIED, ext): "Check browser for styling updates in: {name}"
+       for ext in ('.css', '.scss')},
+    (_MODIFIED, '.html'): "Review your HTML changes in: {name}",
+}
+
+
 class FileChangeHandler(FileSystemEventHandler):
     """Handler for file system events."""
     
@@ -18,47 +47,52 @@ class FileChangeHandler(FileSystemEventHandler):
     
     def on_modified(self, event):
         if not event.is_directory:
-            self.callback("modified", event.src_path)
+            self.callback(_MODIFIED, event.src_path)
     
     def on_created(self, event):
         if not event.is_directory:
-            self.callback("created", event.src_path)
+            self.callback(_CREATED, event.src_path)
     
     def on_deleted(self, event):
         if not event.is_directory:
-            self.callback("deleted", event.src_path)
+            self.callback(_DELETED, event.src_path)
 
 
 class LiveModeManager:
     """Manages live mode for Orby."""
     
-    def __init__(self, project_path: Optional[Path] = None):
+    def __init__(self, project_path: Optional[Path] = None, debounce_ms: int = 100):
         self.project_path = project_path or Path.cwd()
         self.observer = Observer()
         self.handler = None
         self.is_running = False
         self.callbacks: List[Callable[[str, str, str], None]] = []
-        self.ignored_patterns = ['.git', '__pycache__', '.orby', '.DS_Store']
+        self.debounce_ms = debounce_ms
+        
+        # Raw watchdog events are queued here and coalesced by the drain thread
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._stop_draining = threading.Event()
+        self._drain_thread: Optional[threading.Thread] = None
+        self.ignored_patterns = frozenset({'.git', '__pycache__', '.orby', '.DS_Store'})
     
     def _should_ignore(self, file_path: str) -> bool:
         """Check if a file should be ignored."""
-        path_obj = Path(file_path)
-        
-        # Check if any part of the path matches ignored patterns
-        for part in path_obj.parts:
-            if part in self.ignored_patterns:
-                return True
-        
-        return False
+        # Ignored patterns are single path components, so a set probe per
+        # component is enough; no Path object is built per event
+        if os.altsep:
+            # Windows paths may mix separators; Path.parts used to accept both
+            file_path = file_path.replace(os.altsep, os.sep)
+        ignored = self.ignored_patterns
+        return any(part in ignored for part in file_path.split(os.sep))
     
     def _on_file_change(self, event_type: str, file_path: str):
         """Handle file change events."""
-        if self._should_ignore(file_path):
+        if not self.callbacks or self._should_ignore(file_path):
             return
         
         # Get file extension for context
-        path_obj = Path(file_path)
-        file_extension = path_obj.suffix.lower()
+        file_extension = os.path.splitext(file_path)[1].lower()
         
         # Call all registered callbacks
         for callback in self.callbacks:
@@ -68,6 +102,40 @@ class LiveModeManager:
                 # Ignore exceptions in callbacks
                 pass
     
+    def _enqueue_event(self, event_type: str, file_path: str):
+        """Queue a raw file event for the drain thread."""
+        # Drop ignored paths here so churn in e.g. .git never reaches the debounce
+        if self._should_ignore(file_path):
+            return
+        self._pending.append((event_type, file_path, time.monotonic()))
+        self._wake.set()
+    
+    def _drain_events(self):
+        """Coalesce queued events and dispatch each once its own burst goes quiet."""
+        debounce = self.debounce_ms / 1000.0
+        batch: Dict[tuple, float] = {}
+        
+        while not self._stop_draining.is_set():
+            # Sleep until the oldest entry is due, or until new events arrive
+            timeout = None
+            if batch:
+                timeout = max(0.0, min(batch.values()) + debounce - time.monotonic())
+            self._wake.wait(timeout=timeout)
+            self._wake.clear()
+            
+            # Editors emit several events per save; keep one per (path, type)
+            while self._pending:
+                event_type, file_path, timestamp = self._pending.popleft()
+                batch[(file_path, event_type)] = timestamp
+            
+            # A file that keeps changing only delays itself, not the others
+            now = time.monotonic()
+            ready = [key for key, timestamp in batch.items() if now - timestamp >= debounce]
+            for key in ready:
+                del batch[key]
+            for file_path, event_type in ready:
+                self._on_file_change(event_type, file_path)
+    
     def register_callback(self, callback: Callable[[str, str, str], None]):
         """Register a callback for file changes."""
         self.callbacks.append(callback)
@@ -82,8 +150,18 @@ class LiveModeManager:
         if self.is_running:
             return
         
-        self.handler = FileChangeHandler(self._on_file_change)
-        self.observer.schedule(self.handler, str(self.project_path), recursive=True)
+        self._stop_draining.clear()
+        self._drain_thread = threading.Thread(target=self._drain_events, daemon=True)
+        self._drain_thread.start()
+        
+        self.handler = FileChangeHandler(self._enqueue_event)
+        try:
+            self.observer.schedule(
+                self.handler, str(self.project_path), recursive=True, event_filter=_WATCHED_EVENTS
+            )
+        except TypeError:
+            # watchdog < 4.0 has no event_filter
+            self.observer.schedule(self.handler, str(self.project_path), recursive=True)
         self.observer.start()
         self.is_running = True
     
@@ -94,6 +172,13 @@ class LiveModeManager:
         
         self.observer.stop()
         self.observer.join()
+        
+        self._stop_draining.set()
+        self._wake.set()
+        if self._drain_thread:
+            self._drain_thread.join()
+            self._drain_thread = None
+        self._pending.clear()
         self.is_running = False
 
 
@@ -121,23 +206,12 @@ class LiveSuggestions:
     
     def _generate_suggestion(self, event_type: str, file_path: str, file_extension: str) -> Optional[str]:
         """Generate a suggestion based on file change."""
-        path_obj = Path(file_path)
-        file_name = path_obj.name
+        if event_type == _DELETED:
+            return f"File deleted: {os.path.basename(file_path)}. Check if references to it need updating."
         
-        if event_type == "created":
-            if file_extension in ['.py', '.js', '.ts']:
-                return f"Consider adding documentation to your new {file_extension} file: {file_name}"
-            elif file_extension in ['.md']:
-                return f"Review your new markdown file for clarity and completeness: {file_name}"
-        elif event_type == "modified":
-            if file_extension in ['.py', '.js', '.ts']:
-                return f"Consider running tests for your updated {file_extension} file: {file_name}"
-            elif file_extension in ['.css', '.scss']:
-                return f"Check browser for styling updates in: {file_name}"
-            elif file_extension in ['.html']:
-                return f"Review your HTML changes in: {file_name}"
-        elif event_type == "deleted":
-            return f"File deleted: {file_name}. Check if references to it need updating."
+        template = _SUGGESTIONS.get((event_type, file_extension))
+        if template:
+            return template.format(ext=file_extension, name=os.path.basename(file_path))
         
         return None
     
@@ -151,6 +225,22 @@ class LiveSuggestions:
             self.suggestion_callbacks.remove(callback)
 
 
-# Global live mode manager instance
-live_mode_manager = LiveModeManager()
-live_suggestions = LiveSuggestions(live_mode_manager)
\ No newline at end of file
+@functools.lru_cache(maxsize=None)
+def get_live_mode_manager() -> LiveModeManager:
+    """Get the global live mode manager, creating it on first use."""
+    return LiveModeManager()
+
+
+@functools.lru_cache(maxsize=None)
+def get_live_suggestions() -> LiveSuggestions:
+    """Get the global live suggestions provider, creating it on first use."""
+    return LiveSuggestions(get_live_mode_manager())
+
+
+def __getattr__(name):
+    # Legacy module-level instances, created lazily on first access
+    if name == 'live_mode_manager':
+        return get_live_mode_manager()
+    if name == 'live_suggestions':
+        return get_live_suggestions()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
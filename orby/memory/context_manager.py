@@ -2,20 +2,33 @@
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
+import ast
 import hashlib
+import json
 import pickle
 from datetime import datetime
 import threading
 import queue
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from contextlib import contextmanager
 import sqlite3
 
+from .memory_db import ConnectionPool, FTS_MIN_QUERY_LENGTH, create_fts_index, fts_phrase_query
+
+try:
+    import hnswlib
+except ImportError:  # Optional: approximate nearest-neighbor search for large sessions
+    hnswlib = None
+
 
 @dataclass
 class MemoryChunk:
-    """Represents a chunk of memory with its embedding."""
+    """Represents a chunk of memory with its embedding.
+    
+    Embeddings are L2-normalized when created, so cosine similarity between
+    two of them is just their dot product.
+    """
     id: int
     content: str
     embedding: Optional[List[float]] = None
@@ -27,14 +40,56 @@ class MemoryChunk:
     session_id: str = ""
 
 
+class _SessionMatrix:
+    """A session's embeddings as one contiguous (N, d) float32 matrix plus chunk IDs.
+    
+    Rows are preallocated with doubling so appends are amortized O(1).
+    """
+    
+    def __init__(self, matrix: np.ndarray, ids: np.ndarray):
+        self._matrix = matrix
+        self._ids = ids
+        self.size = len(ids)
+    
+    @property
+    def dim(self) -> int:
+        return self._matrix.shape[1]
+    
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes + self._ids.nbytes
+    
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the filled rows and their chunk IDs."""
+        return self._matrix[:self.size], self._ids[:self.size]
+    
+    def append(self, matrix: np.ndarray, ids: List[int]):
+        """Append rows, growing the buffers when full."""
+        needed = self.size + len(ids)
+        if needed > len(self._ids):
+            capacity = max(needed, 2 * len(self._ids))
+            grown_matrix = np.empty((capacity, self.dim), dtype=np.float32)
+            grown_matrix[:self.size] = self._matrix[:self.size]
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            grown_ids[:self.size] = self._ids[:self.size]
+            self._matrix, self._ids = grown_matrix, grown_ids
+        self._matrix[self.size:needed] = matrix
+        self._ids[self.size:needed] = ids
+        self.size = needed
+
+
 class EmbeddingManager:
     """Manages embeddings using sentence transformers."""
     
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
         self.model_name = model_name
         self._model = None
+        self._device = "cpu"
         self._lock = threading.Lock()
         self._embeddings_available = self._check_embeddings_available()
+        # Bounded LRU of recent embeddings, keyed by a digest of the text
+        self._emb_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._emb_cache_max = 4096
     
     def _check_embeddings_available(self) -> bool:
         """Check if embeddings libraries are available."""
@@ -53,24 +108,73 @@ class EmbeddingManager:
                 if self._model is None and self._embeddings_available:
                     try:
                         from sentence_transformers import SentenceTransformer
-                        self._model = SentenceTransformer(self.model_name)
+                        self._device = self._detect_device()
+                        # Pass the device to the constructor so the model and
+                        # encode() agree on where tensors live
+                        self._model = SentenceTransformer(self.model_name, device=self._device)
                     except Exception:
                         # Fallback to a simpler approach if sentence transformers isn't available
                         self._embeddings_available = False
                         self._model = None
         return self._model
     
+    @staticmethod
+    def _detect_device() -> str:
+        """Pick the device to run the embedding model on."""
+        try:
+            import torch
+            if torch.cuda.is_available():
+                return "cuda"
+        except Exception:
+            pass
+        return "cpu"
+    
     def embed_text(self, text: str) -> Optional[List[float]]:
         """Generate embedding for text."""
-        if self._embeddings_available and self.model is not None:
+        return self.embed_texts([text])[0]
+    
+    def embed_texts(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Generate embeddings for several texts, encoding only cache misses in one batch."""
+        if not texts or not self._embeddings_available or self.model is None:
+            # Fallback: no embeddings for any text
+            return [None] * len(texts)
+        
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        results = [None] * len(texts)
+        misses = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._emb_cache.get(key)
+                if cached is not None:
+                    self._emb_cache.move_to_end(key)
+                    results[i] = cached
+                else:
+                    misses.setdefault(key, []).append(i)
+        
+        if misses:
             try:
-                from sentence_transformers import SentenceTransformer
-                embedding = self.model.encode([text])[0]
-                return embedding.tolist()
+                # Normalize on the model's device and copy back to the host once
+                embeddings = self.model.encode(
+                    [texts[positions[0]] for positions in misses.values()],
+                    batch_size=128 if self._device == "cuda" else 64,
+                    device=self._device,
+                    convert_to_tensor=True,
+                    show_progress_bar=False,
+                    normalize_embeddings=True
+                ).cpu().numpy()
             except Exception:
-                pass
-        # Fallback: return None if embedding fails
-        return None
+                return [None] * len(texts)
+            
+            with self._lock:
+                for (key, positions), embedding in zip(misses.items(), embeddings):
+                    embedding = embedding.tolist()
+                    for i in positions:
+                        results[i] = embedding
+                    self._emb_cache[key] = embedding
+                while len(self._emb_cache) > self._emb_cache_max:
+                    self._emb_cache.popitem(last=False)
+        
+        return results
     
     def compute_similarity(self, emb1: List[float], emb2: List[float]) -> float:
         """Compute cosine similarity between two embeddings."""
@@ -93,16 +197,16 @@ class EmbeddingManager:
         if len(text1) != len(text2):
             return 0.0
         
-        # Calculate simple cosine similarity manually
+        # Vectorized cosine similarity; the norms keep it correct for inputs
+        # that did not come from embed_texts and aren't unit length
         try:
-            dot_product = sum(a * b for a, b in zip(text1, text2))
-            magnitude1 = sum(a * a for a in text1) ** 0.5
-            magnitude2 = sum(b * b for b in text2) ** 0.5
-            
-            if magnitude1 == 0 or magnitude2 == 0:
+            a = text1 if isinstance(text1, np.ndarray) else np.asarray(text1, dtype=np.float32)
+            b = text2 if isinstance(text2, np.ndarray) else np.asarray(text2, dtype=np.float32)
+            norm_a = np.linalg.norm(a)
+            norm_b = np.linalg.norm(b)
+            if norm_a == 0 or norm_b == 0:
                 return 0.0
-            
-            return dot_product / (magnitude1 * magnitude2)
+            return float(a @ b / (norm_a * norm_b))
         except:
             return 0.0
 
@@ -110,16 +214,31 @@ class EmbeddingManager:
 class ContextManager:
     """Advanced context manager with smart chunking, embeddings, and retrieval."""
     
+    # Keep IN (...) lists well under SQLite's bound-parameter limit
+    _HASH_BATCH_SIZE = 500
+    
+    # Sessions with at least this many embedded chunks are searched through an
+    # HNSW index when hnswlib is installed; smaller ones use a brute-force matmul
+    _ANN_MIN_CHUNKS = 10000
+    
+    # Upper bound on memory held by cached per-session embedding matrices
+    _MATRIX_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    
+    # Column order of embedding scans, which index rows positionally
+    _EMBEDDING_COLS = ('id', 'embedding', 'embedding_scale')
+    _FETCH_SIZE = 4096
+    
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = db_path or self._get_default_db_path()
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.embedding_manager = EmbeddingManager()
-        self._local = threading.local()
+        self._pool = ConnectionPool(self.db_path)
         self._init_database()
         
-        # For performance, we'll cache recent embeddings
-        self.embedding_cache = {}
-        self.max_cache_size = 1000
+        # Per-session HNSW indexes and embedding matrices, built lazily by search_by_similarity
+        self._ann_indices: Dict[str, Any] = {}
+        self._session_matrices: "OrderedDict[str, _SessionMatrix]" = OrderedDict()
+        self._index_lock = threading.Lock()
     
     @staticmethod
     def _get_default_db_path() -> Path:
@@ -142,6 +261,7 @@ class ContextManager:
                     tags TEXT DEFAULT '[]',
                     metadata TEXT DEFAULT '{}',
                     embedding BLOB,
+                    embedding_scale REAL,
                     embedding_hash TEXT UNIQUE
                 )
             ''')
@@ -151,108 +271,271 @@ class ContextManager:
             conn.execute('CREATE INDEX IF NOT EXISTS idx_chunks_type ON context_chunks(content_type)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_chunks_importance ON context_chunks(importance)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_chunks_embedding_hash ON context_chunks(embedding_hash)')
+            # Partial index covering only embedded chunks, used by similarity scans
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_chunks_session_emb ON context_chunks(session_id) WHERE embedding IS NOT NULL')
+            
+            # Full-text index for keyword search
+            self._fts_available = create_fts_index(conn, 'context_chunks', ['content'])
+            
+            # Schema version 1 stores embeddings as raw float32 bytes instead of pickle
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version < 1:
+                self._migrate_pickled_embeddings(conn)
+            # Schema version 2 stores embeddings L2-normalized
+            if version < 2:
+                self._normalize_stored_embeddings(conn)
+            # Schema version 3 stores tags and metadata as JSON instead of Python repr
+            if version < 3:
+                self._migrate_repr_columns(conn)
+            # Schema version 4 hashes content with blake2b instead of MD5
+            if version < 4:
+                self._rehash_content(conn)
+            # Schema version 5 stores embeddings as int8 with a per-vector scale
+            if version < 5:
+                self._quantize_stored_embeddings(conn)
+                conn.execute('PRAGMA user_version = 5')
             
             conn.commit()
     
-    @contextmanager
-    def _get_db_connection(self):
-        """Get a database connection with thread-local storage."""
-        if not hasattr(self._local, 'connection'):
-            conn = sqlite3.connect(
-                str(self.db_path),
-                check_same_thread=False,
-                detect_types=sqlite3.PARSE_DECLTYPES
-            )
-            conn.row_factory = sqlite3.Row
-            self._local.connection = conn
-        else:
-            conn = self._local.connection
-        
-        try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            pass  # Keep connection open for reuse in same thread
+    def _get_db_connection(self, readonly: bool = False):
+        """Get a pooled read-only connection, or the shared writer connection."""
+        return self._pool.reader() if readonly else self._pool.writer()
+    
+    def close(self):
+        """Close the database connections."""
+        self._pool.close()
+    
+    def ping(self):
+        """Check that the context database is reachable; raises if it is not."""
+        with self._get_db_connection(readonly=True) as conn:
+            conn.execute('SELECT 1')
     
     def _hash_content(self, content: str) -> str:
         """Create a hash of the content for deduplication."""
-        return hashlib.md5(content.encode()).hexdigest()
+        return hashlib.blake2b(content.encode('utf-8', 'ignore'), digest_size=16).hexdigest()
+    
+    def _quantize_embedding(self, embedding: List[float]) -> Tuple[bytes, float]:
+        """Quantize an embedding to int8 bytes plus the scale that restores it."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        scale = float(np.abs(vector).max()) / 127 if vector.size else 0.0
+        if scale == 0.0:
+            return np.zeros(vector.shape, dtype=np.int8).tobytes(), 0.0
+        return np.round(vector / scale).astype(np.int8).tobytes(), scale
+    
+    def _load_embeddings(self, conn, where: str, params: tuple,
+                         dimension: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Load embeddings of the given dimension as a dequantized (N, d) float32 matrix and chunk IDs.
+        
+        where filters context_chunks; rows are fetched in batches and read by
+        position in _EMBEDDING_COLS order.
+        """
+        cursor = conn.cursor()
+        cursor.arraysize = self._FETCH_SIZE
+        cursor.execute(
+            f"SELECT {', '.join(self._EMBEDDING_COLS)} FROM context_chunks "
+            f"WHERE {where} AND embedding IS NOT NULL AND length(embedding) = ?",
+            (*params, dimension)
+        )
+        ids, blobs, scales = [], [], []
+        while (batch := cursor.fetchmany()):
+            for row in batch:
+                ids.append(row[0])
+                blobs.append(row[1])
+                scales.append(row[2])
+        
+        quantized = np.frombuffer(b''.join(blobs), dtype=np.int8).reshape(len(ids), dimension)
+        matrix = quantized.astype(np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+        return matrix, np.asarray(ids, dtype=np.int64)
     
     def _serialize_embedding(self, embedding: List[float]) -> bytes:
-        """Serialize embedding to bytes for storage."""
-        return pickle.dumps(embedding)
+        """Serialize embedding to raw float32 bytes (storage format of schema versions 1-4)."""
+        return np.asarray(embedding, dtype=np.float32).tobytes()
+    
+    def _deserialize_embedding(self, embedding_bytes: bytes) -> np.ndarray:
+        """Deserialize embedding from raw float32 bytes (zero-copy view)."""
+        return np.frombuffer(embedding_bytes, dtype=np.float32)
     
-    def _deserialize_embedding(self, embedding_bytes: bytes) -> List[float]:
-        """Deserialize embedding from bytes."""
-        return pickle.loads(embedding_bytes)
+    def _migrate_pickled_embeddings(self, conn):
+        """Rewrite embeddings stored by older versions with pickle as float32 bytes."""
+        rows = conn.execute(
+            'SELECT id, embedding FROM context_chunks WHERE embedding IS NOT NULL'
+        ).fetchall()
+        updates = []
+        for row in rows:
+            try:
+                embedding = self._serialize_embedding(pickle.loads(row['embedding']))
+            except Exception:
+                # Unreadable embeddings are dropped; the chunk stays keyword-searchable
+                embedding = None
+            updates.append((embedding, row['id']))
+        conn.executemany('UPDATE context_chunks SET embedding = ? WHERE id = ?', updates)
+    
+    def _normalize_stored_embeddings(self, conn):
+        """Rescale embeddings stored by older versions to unit length."""
+        rows = conn.execute(
+            'SELECT id, embedding FROM context_chunks WHERE embedding IS NOT NULL'
+        ).fetchall()
+        updates = []
+        for row in rows:
+            embedding = self._deserialize_embedding(row['embedding'])
+            norm = np.linalg.norm(embedding)
+            if norm > 0:
+                updates.append((self._serialize_embedding(embedding / norm), row['id']))
+        conn.executemany('UPDATE context_chunks SET embedding = ? WHERE id = ?', updates)
+    
+    def _migrate_repr_columns(self, conn):
+        """Rewrite tags/metadata stored by older versions with str() as JSON."""
+        rows = conn.execute('SELECT id, tags, metadata FROM context_chunks').fetchall()
+        updates = []
+        for row in rows:
+            values = []
+            for column, default in (('tags', []), ('metadata', {})):
+                try:
+                    json.loads(row[column])
+                    values.append(row[column])
+                    continue
+                except (TypeError, ValueError):
+                    pass
+                try:
+                    value = ast.literal_eval(row[column])
+                    values.append(json.dumps(value))
+                except (ValueError, SyntaxError, TypeError):
+                    values.append(json.dumps(default))
+            if values != [row['tags'], row['metadata']]:
+                updates.append((*values, row['id']))
+        conn.executemany('UPDATE context_chunks SET tags = ?, metadata = ? WHERE id = ?', updates)
+    
+    def _rehash_content(self, conn):
+        """Recompute content hashes stored by older versions so deduplication still matches."""
+        rows = conn.execute('SELECT id, content FROM context_chunks').fetchall()
+        conn.executemany(
+            'UPDATE context_chunks SET embedding_hash = ? WHERE id = ?',
+            [(self._hash_content(row['content']), row['id']) for row in rows]
+        )
+    
+    def _quantize_stored_embeddings(self, conn):
+        """Convert float32 embeddings stored by older versions to int8 with a scale column."""
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(context_chunks)')}
+        if 'embedding_scale' not in columns:
+            # Tables created before version 5 lack the column
+            conn.execute('ALTER TABLE context_chunks ADD COLUMN embedding_scale REAL')
+        rows = conn.execute(
+            'SELECT id, embedding FROM context_chunks WHERE embedding IS NOT NULL'
+        ).fetchall()
+        conn.executemany(
+            'UPDATE context_chunks SET embedding = ?, embedding_scale = ? WHERE id = ?',
+            [(*self._quantize_embedding(self._deserialize_embedding(row['embedding'])), row['id'])
+             for row in rows]
+        )
     
     def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
         """Split text into overlapping chunks."""
         if len(text) <= chunk_size:
             return [text]
         
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            
-            if end >= len(text):
-                break
-                
-            # Move start forward by chunk_size - overlap
-            start = end - overlap
-        
-        return chunks
+        # Window starts step apart, stopping once a window reaches the end of the text
+        step = chunk_size - overlap
+        return [text[start:start + chunk_size]
+                for start in range(0, len(text) - chunk_size + step, step)]
     
     def add_content(self, session_id: str, content: str, content_type: str = "text", 
                    importance: float = 1.0, tags: List[str] = None, 
                    metadata: Dict[str, Any] = None) -> List[int]:
         """Add content, chunk it, and store with embeddings."""
-        tags = tags or []
-        metadata = metadata or {}
+        entry = {
+            'content_type': content_type,
+            'importance': importance,
+            'tags': tags or [],
+            'metadata': metadata or {}
+        }
+        return self._store_chunks(session_id, [(chunk_text, entry) for chunk_text in self.chunk_text(content)])
+    
+    def add_contents(self, session_id: str, entries: List[Dict[str, Any]]) -> List[int]:
+        """Add several content entries in one transaction with batched embeddings."""
+        pending = [(chunk_text, entry) for entry in entries for chunk_text in self.chunk_text(entry['content'])]
+        return self._store_chunks(session_id, pending)
+    
+    def _store_chunks(self, session_id: str, pending: List[Tuple[str, Dict[str, Any]]]) -> List[int]:
+        """Embed and store (chunk text, entry fields) pairs; returns the IDs of new chunks."""
+        # Hash first so chunks already stored, or repeated in this batch, are never embedded
+        novel = {}
+        for chunk_text, entry in pending:
+            novel.setdefault(self._hash_content(chunk_text), (chunk_text, entry))
+        with self._get_db_connection(readonly=True) as conn:
+            for content_hash in self._existing_hashes(conn, list(novel)):
+                del novel[content_hash]
+        if not novel:
+            return []
         
-        # Chunk the content
-        chunks = self.chunk_text(content)
-        chunk_ids = []
+        # Embed all novel chunks in one batch
+        embeddings = self.embedding_manager.embed_texts([chunk_text for chunk_text, _ in novel.values()])
+        now = datetime.now().isoformat()
         
-        for chunk_text in chunks:
-            # Generate embedding
-            embedding = self.embedding_manager.embed_text(chunk_text)
-            
-            # Create embedding hash for deduplication
-            content_hash = self._hash_content(chunk_text)
-            
-            with self._get_db_connection() as conn:
-                try:
-                    cursor = conn.execute('''
-                        INSERT INTO context_chunks 
-                        (session_id, content, content_type, importance, created_at, updated_at, tags, metadata, embedding, embedding_hash)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        session_id,
-                        chunk_text,
-                        content_type,
-                        importance,
-                        datetime.now().isoformat(),
-                        datetime.now().isoformat(),
-                        str(tags),
-                        str(metadata),
-                        self._serialize_embedding(embedding) if embedding else None,
-                        content_hash
-                    ))
-                    chunk_ids.append(cursor.lastrowid)
-                except sqlite3.IntegrityError:
-                    # Content already exists, skip
-                    continue
+        rows = [(
+            session_id,
+            chunk_text,
+            entry.get('content_type', 'text'),
+            entry.get('importance', 1.0),
+            now,
+            now,
+            json.dumps(entry.get('tags') or []),
+            json.dumps(entry.get('metadata') or {}),
+            *(self._quantize_embedding(embedding) if embedding else (None, None)),
+            content_hash
+        ) for (content_hash, (chunk_text, entry)), embedding in zip(novel.items(), embeddings)]
+        
+        with self._get_db_connection() as conn:
+            chunk_ids = self._insert_chunks(conn, rows)
         
+        self._index_new_chunks(session_id, chunk_ids)
         return chunk_ids
     
+    def _existing_hashes(self, conn, hashes: List[str]) -> set:
+        """Get which of the given content hashes are already stored."""
+        existing = set()
+        for i in range(0, len(hashes), self._HASH_BATCH_SIZE):
+            batch = hashes[i:i + self._HASH_BATCH_SIZE]
+            cursor = conn.execute(
+                'SELECT embedding_hash FROM context_chunks WHERE embedding_hash IN (%s)'
+                % ','.join('?' * len(batch)), batch
+            )
+            existing.update(row[0] for row in cursor)
+        return existing
+    
+    def _insert_chunks(self, conn, rows: List[tuple]) -> List[int]:
+        """Insert chunk rows with one executemany, skipping content already stored.
+        
+        Each row ends with its content hash; returns the IDs of the new chunks.
+        """
+        # Drop chunks whose hash is already stored (e.g. by a concurrent writer)
+        # or repeated within this batch
+        existing = self._existing_hashes(conn, list(dict.fromkeys(row[-1] for row in rows)))
+        new_rows = {}
+        for row in rows:
+            if row[-1] not in existing:
+                new_rows.setdefault(row[-1], row)
+        if not new_rows:
+            return []
+        
+        conn.executemany('''
+            INSERT OR IGNORE INTO context_chunks 
+            (session_id, content, content_type, importance, created_at, updated_at, tags, metadata,
+             embedding, embedding_scale, embedding_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', list(new_rows.values()))
+        
+        # Recover the new chunk IDs in insertion order
+        new_hashes = list(new_rows)
+        chunk_ids = {}
+        for i in range(0, len(new_hashes), self._HASH_BATCH_SIZE):
+            batch = new_hashes[i:i + self._HASH_BATCH_SIZE]
+            cursor = conn.execute(
+                'SELECT id, embedding_hash FROM context_chunks WHERE embedding_hash IN (%s)'
+                % ','.join('?' * len(batch)), batch
+            )
+            chunk_ids.update((row[1], row[0]) for row in cursor)
+        return [chunk_ids[content_hash] for content_hash in new_hashes if content_hash in chunk_ids]
+    
     def search_by_similarity(self, session_id: str, query: str, top_k: int = 10, 
                            min_similarity: float = 0.3) -> List[MemoryChunk]:
         """Search for chunks similar to the query using embeddings."""
@@ -261,81 +544,185 @@ class ContextManager:
             # Fallback to keyword search if embedding fails
             return self._keyword_search(session_id, query, top_k)
         
-        with self._get_db_connection() as conn:
-            cursor = conn.execute('''
+        if top_k <= 0:
+            return []
+        
+        # Large sessions go through the approximate index when one is available
+        index = self._get_ann_index(session_id, len(query_embedding))
+        if index is not None:
+            return self._ann_search(index, query_embedding, top_k, min_similarity)
+        
+        matrix, chunk_ids = self._get_session_matrix(session_id, len(query_embedding))
+        if not len(chunk_ids):
+            return []
+        
+        # Stored and query embeddings are unit length, so one matrix-vector
+        # product gives the cosine similarity against every chunk
+        similarities = matrix @ np.asarray(query_embedding, dtype=np.float32)
+        
+        # Pick the top_k without sorting every score, then order just those;
+        # sessions no larger than top_k need only one sort
+        if top_k < len(chunk_ids):
+            candidates = np.argpartition(-similarities, top_k - 1)[:top_k]
+            candidates = candidates[np.argsort(-similarities[candidates], kind='stable')]
+        else:
+            candidates = np.argsort(-similarities, kind='stable')
+        
+        return self._load_chunks([int(chunk_ids[i]) for i in candidates
+                                  if similarities[i] >= min_similarity])
+    
+    def _get_session_matrix(self, session_id: str, dimension: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the session's embeddings with the given dimension as an (N, d) matrix and chunk IDs.
+        
+        Matrices are cached per session, within _MATRIX_CACHE_MAX_BYTES, and
+        kept current as add_content stores new chunks.
+        """
+        with self._index_lock:
+            cached = self._session_matrices.get(session_id)
+            if cached is not None and cached.dim == dimension:
+                self._session_matrices.move_to_end(session_id)
+                return cached.view()
+            
+            # Only embeddings with the query's dimension can be scored against it
+            with self._get_db_connection(readonly=True) as conn:
+                matrix, chunk_ids = self._load_embeddings(conn, 'session_id = ?', (session_id,), dimension)
+            entry = _SessionMatrix(matrix, chunk_ids)
+            
+            self._session_matrices.pop(session_id, None)
+            if entry.nbytes <= self._MATRIX_CACHE_MAX_BYTES:
+                self._session_matrices[session_id] = entry
+                self._trim_session_matrices()
+            return entry.view()
+    
+    def _trim_session_matrices(self):
+        """Evict least recently used session matrices until the cache fits its budget."""
+        total = sum(entry.nbytes for entry in self._session_matrices.values())
+        while total > self._MATRIX_CACHE_MAX_BYTES and self._session_matrices:
+            _, evicted = self._session_matrices.popitem(last=False)
+            total -= evicted.nbytes
+    
+    def _load_chunks(self, chunk_ids: List[int]) -> List[MemoryChunk]:
+        """Load chunks by ID, keeping the order of chunk_ids."""
+        if not chunk_ids:
+            return []
+        
+        with self._get_db_connection(readonly=True) as conn:
+            rows = conn.execute('''
                 SELECT id, session_id, content, content_type, importance, created_at, tags, metadata
-                FROM context_chunks 
-                WHERE session_id = ? AND embedding IS NOT NULL
-            ''', (session_id,))
+                FROM context_chunks WHERE id IN (%s)
+            ''' % ','.join('?' * len(chunk_ids)), chunk_ids).fetchall()
+        
+        rows_by_id = {row['id']: row for row in rows}
+        return [self._row_to_chunk(rows_by_id[chunk_id]) for chunk_id in chunk_ids if chunk_id in rows_by_id]
+    
+    def _row_to_chunk(self, row: sqlite3.Row) -> MemoryChunk:
+        """Build a MemoryChunk from a context_chunks row."""
+        return MemoryChunk(
+            id=row['id'],
+            content=row['content'],
+            content_type=row['content_type'],
+            importance=row['importance'],
+            created_at=row['created_at'],
+            tags=json.loads(row['tags']),
+            metadata=json.loads(row['metadata']),
+            session_id=row['session_id']
+        )
+    
+    def _get_ann_index(self, session_id: str, dimension: int):
+        """Get the session's HNSW index, building it on first use.
+        
+        Returns None when hnswlib isn't installed or the session is small
+        enough for brute-force search.
+        """
+        if hnswlib is None:
+            return None
+        
+        with self._index_lock:
+            index = self._ann_indices.get(session_id)
+            if index is not None:
+                return index if index.dim == dimension else None
             
-            results = []
-            for row in cursor.fetchall():
-                try:
-                    # Try to load the stored embedding
-                    embedding_blob = conn.execute(
-                        'SELECT embedding FROM context_chunks WHERE id = ?', 
-                        (row['id'],)
-                    ).fetchone()['embedding']
-                    
-                    if embedding_blob:
-                        stored_embedding = self._deserialize_embedding(embedding_blob)
-                        similarity = self.embedding_manager.compute_similarity(
-                            query_embedding, stored_embedding
-                        )
-                        
-                        if similarity >= min_similarity:
-                            chunk = MemoryChunk(
-                                id=row['id'],
-                                content=row['content'],
-                                content_type=row['content_type'],
-                                importance=row['importance'],
-                                created_at=row['created_at'],
-                                tags=eval(row['tags']),  # Safe because we control the data
-                                metadata=eval(row['metadata']),  # Safe because we control the data
-                                session_id=row['session_id']
-                            )
-                            results.append((chunk, similarity))
-                except Exception:
-                    # If embedding comparison fails, skip this chunk
-                    continue
+            with self._get_db_connection(readonly=True) as conn:
+                count = conn.execute('''
+                    SELECT COUNT(*) FROM context_chunks
+                    WHERE session_id = ? AND embedding IS NOT NULL AND length(embedding) = ?
+                ''', (session_id, dimension)).fetchone()[0]
+                if count < self._ANN_MIN_CHUNKS:
+                    return None
+                matrix, chunk_ids = self._load_embeddings(conn, 'session_id = ?', (session_id,), dimension)
+            
+            index = hnswlib.Index(space='cosine', dim=dimension)
+            index.init_index(max_elements=len(chunk_ids) * 2, ef_construction=200, M=16)
+            index.add_items(matrix, chunk_ids)
+            self._ann_indices[session_id] = index
+            return index
+    
+    def _index_new_chunks(self, session_id: str, chunk_ids: List[int]):
+        """Add newly stored chunks to the session's cached matrix and HNSW index, if any."""
+        if not chunk_ids:
+            return
+        
+        with self._index_lock:
+            index = self._ann_indices.get(session_id)
+            cached = self._session_matrices.get(session_id)
+            if index is None and cached is None:
+                return
+            
+            dimension = index.dim if index is not None else cached.dim
+            with self._get_db_connection(readonly=True) as conn:
+                matrix, new_ids = self._load_embeddings(
+                    conn, 'id IN (%s)' % ','.join('?' * len(chunk_ids)), tuple(chunk_ids), dimension
+                )
+            if not len(new_ids):
+                return
+            
+            if cached is not None and cached.dim == dimension:
+                cached.append(matrix, new_ids)
+                self._trim_session_matrices()
             
-            # Sort by similarity and return top_k
-            results.sort(key=lambda x: x[1], reverse=True)
-            return [chunk for chunk, _ in results[:top_k]]
+            if index is not None:
+                needed = index.get_current_count() + len(new_ids)
+                if needed > index.get_max_elements():
+                    index.resize_index(needed * 2)
+                index.add_items(matrix, new_ids)
+    
+    def _ann_search(self, index, query_embedding: List[float], top_k: int,
+                    min_similarity: float) -> List[MemoryChunk]:
+        """Search a session's HNSW index and load the matching chunks."""
+        with self._index_lock:
+            k = min(top_k, index.get_current_count())
+            index.set_ef(max(64, k))
+            labels, distances = index.knn_query(np.asarray(query_embedding, dtype=np.float32), k=k)
+        
+        # hnswlib's cosine distance is 1 - similarity
+        return self._load_chunks([int(label) for label, distance in zip(labels[0], distances[0])
+                                  if 1.0 - distance >= min_similarity])
     
     def _keyword_search(self, session_id: str, query: str, top_k: int = 10) -> List[MemoryChunk]:
         """Fallback keyword search when embeddings aren't available."""
-        query_lower = query.lower()
-        
-        with self._get_db_connection() as conn:
-            cursor = conn.execute('''
+        with self._get_db_connection(readonly=True) as conn:
+            if self._fts_available and len(query) >= FTS_MIN_QUERY_LENGTH:
+                # The trigram index finds the same substring matches as a LIKE scan
+                match_sql = 'id IN (SELECT rowid FROM context_chunks_fts WHERE context_chunks_fts MATCH ?)'
+                match_param = fts_phrase_query(query)
+            else:
+                match_sql = 'LOWER(content) LIKE ?'
+                match_param = f'%{query.lower()}%'
+
+            rows = conn.execute(f'''
                 SELECT id, session_id, content, content_type, importance, created_at, tags, metadata
-                FROM context_chunks 
-                WHERE session_id = ? AND LOWER(content) LIKE ?
+                FROM context_chunks
+                WHERE session_id = ? AND {match_sql}
                 ORDER BY importance DESC
                 LIMIT ?
-            ''', (session_id, f'%{query_lower}%', top_k))
-            
-            results = []
-            for row in cursor.fetchall():
-                chunk = MemoryChunk(
-                    id=row['id'],
-                    content=row['content'],
-                    content_type=row['content_type'],
-                    importance=row['importance'],
-                    created_at=row['created_at'],
-                    tags=eval(row['tags']),
-                    metadata=eval(row['metadata']),
-                    session_id=row['session_id']
-                )
-                results.append(chunk)
-            
-            return results
+            ''', (session_id, match_param, top_k)).fetchall()
+
+            return [self._row_to_chunk(row) for row in rows]
     
     def get_context_for_session(self, session_id: str, max_chunks: int = 20, 
                               content_types: Optional[List[str]] = None) -> str:
         """Get relevant context for a session."""
-        with self._get_db_connection() as conn:
+        with self._get_db_connection(readonly=True) as conn:
             # Build query based on content types
             query = '''
                 SELECT id, content, content_type, importance, created_at, tags, metadata
@@ -356,7 +743,7 @@ class ContextManager:
             
             context_parts = []
             for row in cursor.fetchall():
-                tags_str = ', '.join(eval(row['tags']))
+                tags_str = ', '.join(json.loads(row['tags']))
                 tag_info = f" [Tags: {tags_str}]" if tags_str else ""
                 context_parts.append(
                     f"[{row['content_type'].upper()} - {row['created_at']}{tag_info}]\n{row['content']}"
@@ -371,11 +758,15 @@ class ContextManager:
                 'DELETE FROM context_chunks WHERE session_id = ?', 
                 (session_id,)
             )
-            return cursor.rowcount > 0
+        
+        with self._index_lock:
+            self._ann_indices.pop(session_id, None)
+            self._session_matrices.pop(session_id, None)
+        return cursor.rowcount > 0
     
     def get_session_stats(self, session_id: str) -> Dict[str, Any]:
         """Get statistics for a session."""
-        with self._get_db_connection() as conn:
+        with self._get_db_connection(readonly=True) as conn:
             cursor = conn.execute('''
                 SELECT 
                     COUNT(*) as total_chunks,
@@ -7,15 +7,196 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 from contextlib import contextmanager
 import threading
+import queue
+
+
+# Applied to every new connection: WAL lets readers run alongside a writer,
+# NORMAL sync drops most per-commit fsyncs, and the busy timeout waits out
+# short locks instead of raising "database is locked".
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply the shared performance PRAGMAs to a new connection."""
+    for pragma in SQLITE_PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.DatabaseError:
+            # Some filesystems (e.g. network mounts) reject WAL; keep the defaults
+            pass
+    return conn
+
+
+class ConnectionPool:
+    """A single writer connection plus a bounded pool of read-only connections.
+    
+    WAL mode lets the readers run alongside the writer; writes are serialized
+    on one connection instead of contending for the database lock.
+    """
+    
+    def __init__(self, db_path: Union[str, Path], max_readers: int = 4):
+        self.db_path = db_path
+        self.max_readers = max_readers
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=max_readers)
+        self._opened_readers = 0
+        self._readers_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+    
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        """Open a new configured connection."""
+        conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        configure_connection(conn)
+        if readonly:
+            conn.execute("PRAGMA query_only=1")
+        return conn
+    
+    @contextmanager
+    def reader(self):
+        """Check out a read-only connection, opening one if the pool isn't full yet."""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._readers_lock:
+                open_new = self._opened_readers < self.max_readers
+                if open_new:
+                    self._opened_readers += 1
+            conn = self._connect(readonly=True) if open_new else self._readers.get()
+        
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
+    @contextmanager
+    def writer(self):
+        """Hold the writer connection, committing on success and rolling back on error."""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def close(self):
+        """Close the writer and every pooled reader."""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._opened_readers = 0
+
+
+def create_fts_index(conn: sqlite3.Connection, table: str, columns: List[str]) -> bool:
+    """Create a trigram FTS5 index mirroring columns of table, kept in sync by triggers.
+
+    Trigram tokens make a phrase MATCH a case-insensitive substring test, the
+    same rows LIKE '%query%' returns. Returns False when this SQLite build has
+    no FTS5 trigram support.
+    """
+    fts_table = f"{table}_fts"
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+
+    existing = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)
+    ).fetchone()
+    if existing and 'trigram' not in existing[0]:
+        # Indexes built with an earlier tokenizer are rebuilt from the content table
+        for suffix in ('ai', 'ad', 'au'):
+            conn.execute(f'DROP TRIGGER IF EXISTS {fts_table}_{suffix}')
+        conn.execute(f'DROP TABLE {fts_table}')
+        existing = None
+
+    try:
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+            USING fts5({column_list}, content='{table}', content_rowid='id', tokenize='trigram')
+        ''')
+    except sqlite3.OperationalError:
+        return False
+    
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_list} ON {table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    ''')
+    
+    if not existing:
+        # Index rows written before the FTS table existed
+        conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+    return True
+
+
+# Trigram indexes can't answer queries shorter than one trigram
+FTS_MIN_QUERY_LENGTH = 3
+
+
+def fts_phrase_query(query: str) -> str:
+    """Build an FTS5 MATCH expression matching query as a substring."""
+    return '"' + query.replace('"', '""') + '"'
 
 
 class MemoryDatabase:
     """SQLite-based memory database with thread-safe operations."""
     
+    _LATEST_SAVED_SESSION_SQL = '''
+        SELECT session_id FROM sessions 
+        WHERE session_id LIKE ?
+        ORDER BY created_at DESC
+        LIMIT 1
+    '''
+    
+    _SAVED_SESSIONS_SQL = '''
+        SELECT DISTINCT session_id
+        FROM sessions 
+        WHERE session_id LIKE 'saved_%'
+        ORDER BY created_at DESC
+    '''
+    
+    _INSERT_CHUNK_SQL = '''
+        INSERT INTO memory_chunks (entry_id, chunk_index, content, created_at)
+        VALUES (?, ?, ?, ?)
+    '''
+    
     def __init__(self, db_path: Optional[Union[str, Path]] = None):
         self.db_path = db_path or self._get_default_db_path()
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._local = threading.local()
+        self._pool = ConnectionPool(self.db_path)
         self._init_database()
     
     @staticmethod
@@ -74,34 +255,18 @@ class MemoryDatabase:
             conn.execute('CREATE INDEX IF NOT EXISTS idx_memory_entries_type ON memory_entries(content_type)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_memory_chunks_entry ON memory_chunks(entry_id)')
             
+            # Full-text index for keyword search
+            self._fts_available = create_fts_index(conn, 'memory_entries', ['content', 'metadata'])
+            
             conn.commit()
     
-    @contextmanager
-    def _get_db_connection(self):
-        """Get a database connection with thread-local storage for connection reusing."""
-        if not hasattr(self._local, 'connection'):
-            conn = sqlite3.connect(
-                str(self.db_path), 
-                check_same_thread=False,
-                detect_types=sqlite3.PARSE_DECLTYPES
-            )
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
-            self._local.connection = conn
-        else:
-            conn = self._local.connection
-        
-        try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            # For now, keeping connection open for reuse in the same thread
-            pass
+    def _get_db_connection(self, readonly: bool = False):
+        """Get a pooled read-only connection, or the shared writer connection."""
+        return self._pool.reader() if readonly else self._pool.writer()
     
     def create_session(self, session_id: str, project_path: str, metadata: Optional[Dict] = None) -> bool:
         """Create a new session."""
+        now = datetime.now().isoformat()
         try:
             with self._get_db_connection() as conn:
                 conn.execute('''
@@ -110,8 +275,8 @@ class MemoryDatabase:
                 ''', (
                     session_id,
                     project_path,
-                    datetime.now().isoformat(),
-                    datetime.now().isoformat(),
+                    now,
+                    now,
                     json.dumps(metadata or {})
                 ))
                 return True
@@ -120,7 +285,7 @@ class MemoryDatabase:
     
     def session_exists(self, session_id: str) -> bool:
         """Check if a session exists."""
-        with self._get_db_connection() as conn:
+        with self._get_db_connection(readonly=True) as conn:
             cursor = conn.execute(
                 'SELECT 1 FROM sessions WHERE session_id = ?',
                 (session_id,)
@@ -129,11 +294,16 @@ class MemoryDatabase:
     
     def add_memory_entry(self, session_id: str, content: str, content_type: str = 'text', 
                         importance: float = 1.0, tags: List[str] = None, 
-                        metadata: Dict[str, Any] = None) -> int:
-        """Add a memory entry."""
+                        metadata: Dict[str, Any] = None, chunk_large_content: bool = True) -> int:
+        """Add a memory entry.
+        
+        Pass chunk_large_content=False when another store (such as the context
+        manager) already keeps a chunked copy of the content.
+        """
         if not self.session_exists(session_id):
             self.create_session(session_id, str(Path.cwd()), {})
         
+        now = datetime.now().isoformat()
         with self._get_db_connection() as conn:
             cursor = conn.execute('''
                 INSERT INTO memory_entries 
@@ -144,36 +314,93 @@ class MemoryDatabase:
                 content,
                 content_type,
                 importance,
-                datetime.now().isoformat(),
-                datetime.now().isoformat(),
+                now,
+                now,
                 json.dumps(tags or []),
                 json.dumps(metadata or {})
             ))
             
             entry_id = cursor.lastrowid
             
-            # If content is large, also store it in chunks
-            if len(content) > 1000:  # If content is larger than 1000 chars
-                self._chunk_and_store_content(entry_id, content)
+            # If content is large, also store it in chunks within the same transaction
+            if chunk_large_content and len(content) > 1000:  # If content is larger than 1000 chars
+                conn.executemany(self._INSERT_CHUNK_SQL, self._build_chunk_rows(entry_id, content, created_at=now))
             
             return entry_id
     
+    def add_memory_entries(self, session_id: str, entries: List[Dict[str, Any]],
+                           chunk_large_content: bool = True) -> List[int]:
+        """Add several memory entries in a single transaction."""
+        if not entries:
+            return []
+        
+        if not self.session_exists(session_id):
+            self.create_session(session_id, str(Path.cwd()), {})
+        
+        now = datetime.now().isoformat()
+        entry_ids = []
+        chunk_rows = []
+        
+        with self._get_db_connection() as conn:
+            for entry in entries:
+                content = entry['content']
+                cursor = conn.execute('''
+                    INSERT INTO memory_entries 
+                    (session_id, content, content_type, importance, created_at, updated_at, tags, metadata)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    session_id,
+                    content,
+                    entry.get('content_type', 'text'),
+                    entry.get('importance', 1.0),
+                    now,
+                    now,
+                    json.dumps(entry.get('tags') or []),
+                    json.dumps(entry.get('metadata') or {})
+                ))
+                entry_ids.append(cursor.lastrowid)
+                
+                if chunk_large_content and len(content) > 1000:
+                    chunk_rows.extend(self._build_chunk_rows(cursor.lastrowid, content, created_at=now))
+            
+            if chunk_rows:
+                conn.executemany(self._INSERT_CHUNK_SQL, chunk_rows)
+        
+        return entry_ids
+    
+    def _build_chunk_rows(self, entry_id: int, content: str, chunk_size: int = 500,
+                          created_at: Optional[str] = None) -> List[tuple]:
+        """Split large content into rows for the chunks table."""
+        created_at = created_at or datetime.now().isoformat()
+        return [
+            (entry_id, i // chunk_size, content[i:i + chunk_size], created_at)
+            for i in range(0, len(content), chunk_size)
+        ]
+    
     def _chunk_and_store_content(self, entry_id: int, content: str, chunk_size: int = 500):
         """Chunk large content and store in chunks table."""
-        chunks = []
-        for i in range(0, len(content), chunk_size):
-            chunk = content[i:i + chunk_size]
-            chunks.append((entry_id, i // chunk_size, chunk, datetime.now().isoformat()))
+        chunks = self._build_chunk_rows(entry_id, content, chunk_size)
         
         with self._get_db_connection() as conn:
-            conn.executemany('''
-                INSERT INTO memory_chunks (entry_id, chunk_index, content, created_at)
-                VALUES (?, ?, ?, ?)
-            ''', chunks)
+            conn.executemany(self._INSERT_CHUNK_SQL, chunks)
+    
+    def find_latest_saved_session(self, session_name: str) -> Optional[str]:
+        """Get the most recent saved session ID for a session name."""
+        with self._get_db_connection(readonly=True) as conn:
+            row = conn.execute(
+                self._LATEST_SAVED_SESSION_SQL, (f"saved_{session_name}_%",)
+            ).fetchone()
+        return row['session_id'] if row else None
+    
+    def get_saved_session_ids(self) -> List[str]:
+        """Get all saved session IDs, newest first."""
+        with self._get_db_connection(readonly=True) as conn:
+            rows = conn.execute(self._SAVED_SESSIONS_SQL).fetchall()
+        return [row['session_id'] for row in rows]
     
     def get_memory_entries(self, session_id: str, limit: int = 50, offset: int = 0) -> List[Dict]:
         """Get memory entries for a session."""
-        with self._get_db_connection() as conn:
+        with self._get_db_connection(readonly=True) as conn:
             cursor = conn.execute('''
                 SELECT * FROM memory_entries 
                 WHERE session_id = ? 
@@ -187,14 +414,29 @@ class MemoryDatabase:
     def search_memory(self, session_id: str, query: str, content_type: Optional[str] = None, 
                      limit: int = 20) -> List[Dict]:
         """Search memory entries containing the query."""
+        if self._fts_available and len(query) >= FTS_MIN_QUERY_LENGTH:
+            # The trigram index finds the same substring matches as the scan below
+            return self._search_memory(
+                '''
+                SELECT * FROM memory_entries
+                WHERE id IN (SELECT rowid FROM memory_entries_fts WHERE memory_entries_fts MATCH ?)
+                AND session_id = ?
+                ''',
+                [fts_phrase_query(query), session_id], content_type, limit
+            )
+
         query_lower = query.lower()
-        
-        sql = '''
-            SELECT * FROM memory_entries 
-            WHERE session_id = ? AND (LOWER(content) LIKE ? OR LOWER(metadata) LIKE ?)
-        '''
-        params = [session_id, f'%{query_lower}%', f'%{query_lower}%']
-        
+        return self._search_memory(
+            '''
+            SELECT * FROM memory_entries
+            WHERE (LOWER(content) LIKE ? OR LOWER(metadata) LIKE ?) AND session_id = ?
+            ''',
+            [f'%{query_lower}%', f'%{query_lower}%', session_id], content_type, limit
+        )
+    
+    def _search_memory(self, sql: str, params: List[Any], content_type: Optional[str],
+                       limit: int) -> List[Dict]:
+        """Run a search_memory query with the shared filters and ordering."""
         if content_type:
             sql += ' AND content_type = ?'
             params.append(content_type)
@@ -202,7 +444,7 @@ class MemoryDatabase:
         sql += ' ORDER BY importance DESC, created_at DESC LIMIT ?'
         params.append(limit)
         
-        with self._get_db_connection() as conn:
+        with self._get_db_connection(readonly=True) as conn:
             cursor = conn.execute(sql, params)
             rows = cursor.fetchall()
             return [self._row_to_dict(row) for row in rows]
@@ -237,7 +479,7 @@ class MemoryDatabase:
     
     def get_session_summary(self, session_id: str) -> Dict[str, Any]:
         """Get summary statistics for a session."""
-        with self._get_db_connection() as conn:
+        with self._get_db_connection(readonly=True) as conn:
             # Get count of different content types
             cursor = conn.execute('''
                 SELECT content_type, COUNT(*) as count
@@ -260,19 +502,24 @@ class MemoryDatabase:
                 'total_entries': stats['total'] or 0,
                 'average_importance': stats['avg_importance'] or 0.0,
                 'content_type_counts': content_type_counts,
-                'last_updated': self._get_session_last_updated(session_id)
+                # Reuse this connection; a second checkout can deadlock a full pool
+                'last_updated': self._get_session_last_updated(session_id, conn)
             }
     
-    def _get_session_last_updated(self, session_id: str) -> Optional[str]:
-        """Get the last updated time for a session."""
-        with self._get_db_connection() as conn:
-            cursor = conn.execute('''
-                SELECT MAX(updated_at) as last_update
-                FROM memory_entries 
-                WHERE session_id = ?
-            ''', (session_id,))
-            result = cursor.fetchone()
-            return result['last_update'] if result and result['last_update'] else None
+    def _get_session_last_updated(self, session_id: str,
+                                  conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+        """Get the last updated time for a session, on conn if the caller already holds one."""
+        if conn is None:
+            with self._get_db_connection(readonly=True) as conn:
+                return self._get_session_last_updated(session_id, conn)
+        
+        cursor = conn.execute('''
+            SELECT MAX(updated_at) as last_update
+            FROM memory_entries 
+            WHERE session_id = ?
+        ''', (session_id,))
+        result = cursor.fetchone()
+        return result['last_update'] if result and result['last_update'] else None
     
     def _row_to_dict(self, row: sqlite3.Row) -> Dict:
         """Convert a SQLite row to a dictionary."""
@@ -283,7 +530,5 @@ class MemoryDatabase:
         return data
     
     def close(self):
-        """Close the database connection."""
-        if hasattr(self._local, 'connection'):
-            self._local.connection.close()
-            delattr(self._local, 'connection')
\ No newline at end of file
+        """Close the database connections."""
+        self._pool.close()
\ No newline at end of file
@@ -2,12 +2,25 @@
 import os
 import subprocess
 import json
+import asyncio
+import hashlib
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import requests
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+import aiohttp
 from dataclasses import dataclass, field
 from datetime import datetime
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # Optional: faster parsing of backend model lists
+    _json_loads = json.loads
+
+_HOME = Path.home().resolve()
+
 
 @dataclass
 class ModelInfo:
@@ -23,92 +36,234 @@ class ModelInfo:
     last_used: Optional[datetime] = None
 
 
+class _ProbeResult(NamedTuple):
+    """Last response seen from a backend's model list endpoint."""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: bytes
+    models: List[ModelInfo]
+
+
 class ModelDetector:
     """Detects available local models from various backends."""
     
     def __init__(self):
         self.models: List[ModelInfo] = []
+        self._probe_cache: Dict[str, _ProbeResult] = {}
     
-    def detect_all_models(self) -> List[ModelInfo]:
-        """Detect models from all available sources."""
-        self.models = []
+    def detect_all_models(self, force_rescan: bool = False) -> List[ModelInfo]:
+        """Detect models from all available sources.
         
-        # Detect Ollama models
-        self.models.extend(self._detect_ollama_models())
-        
-        # Detect LM Studio models
-        self.models.extend(self._detect_lmstudio_models())
-        
-        # Detect other local models
-        self.models.extend(self._detect_local_models())
+        Local model directories are rescanned only when they changed, unless
+        force_rescan is set.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.models = asyncio.run(self._detect_all_async(force_rescan))
+        else:
+            # Already inside an event loop (e.g. the TUI); run the probes on a worker thread
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                self.models = executor.submit(asyncio.run, self._detect_all_async(force_rescan)).result()
         
         return self.models
     
-    def _detect_ollama_models(self) -> List[ModelInfo]:
-        """Detect models available in Ollama."""
+    async def _detect_all_async(self, force_rescan: bool = False) -> List[ModelInfo]:
+        """Probe every backend concurrently, keeping Ollama, LM Studio, local order."""
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as session:
+            results = await asyncio.gather(
+                self._detect_ollama_models(session),
+                self._detect_lmstudio_models(session),
+                asyncio.to_thread(self._detect_local_models, force_rescan),
+                return_exceptions=True
+            )
+        
         models = []
+        for result in results:
+            if not isinstance(result, BaseException):
+                models.extend(result)
+        return models
+    
+    async def _detect_ollama_models(self, session: aiohttp.ClientSession) -> List[ModelInfo]:
+        """Detect models available in Ollama."""
         try:
             # Check if Ollama is running
-            response = requests.get("http://localhost:11434/api/tags", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                for model_data in data.get("models", []):
-                    models.append(ModelInfo(
-                        name=model_data.get("name", ""),
-                        backend="ollama",
-                        size=model_data.get("size", 0),
-                        parameters=model_data.get("details", {}).get("parameter_size", "Unknown")
-                    ))
+            return await self._probe_backend(session, "http://localhost:11434/api/tags", self._parse_ollama_models)
         except Exception:
             # Ollama not available
-            pass
-        
-        return models
+            return []
+    
+    @staticmethod
+    def _parse_ollama_models(data: Dict) -> List[ModelInfo]:
+        """Build ModelInfo entries from Ollama's /api/tags response."""
+        return [
+            ModelInfo(
+                name=model_data.get("name", ""),
+                backend="ollama",
+                size=model_data.get("size", 0),
+                parameters=model_data.get("details", {}).get("parameter_size", "Unknown")
+            )
+            for model_data in data.get("models", [])
+        ]
     
-    def _detect_lmstudio_models(self) -> List[ModelInfo]:
+    async def _detect_lmstudio_models(self, session: aiohttp.ClientSession) -> List[ModelInfo]:
         """Detect models available in LM Studio."""
-        models = []
         try:
             # Check if LM Studio is running
-            response = requests.get("http://localhost:1234/v1/models", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                for model_data in data.get("data", []):
-                    models.append(ModelInfo(
-                        name=model_data.get("id", ""),
-                        backend="lmstudio"
-                    ))
+            return await self._probe_backend(session, "http://localhost:1234/v1/models", self._parse_lmstudio_models)
         except Exception:
             # LM Studio not available
-            pass
+            return []
+    
+    @staticmethod
+    def _parse_lmstudio_models(data: Dict) -> List[ModelInfo]:
+        """Build ModelInfo entries from LM Studio's /v1/models response."""
+        return [
+            ModelInfo(
+                name=model_data.get("id", ""),
+                backend="lmstudio"
+            )
+            for model_data in data.get("data", [])
+        ]
+    
+    @staticmethod
+    async def _port_open(url: str, timeout: float = 0.05) -> bool:
+        """Cheap TCP connect check so a backend that isn't running costs no HTTP round trip."""
+        parsed = urlparse(url)
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(parsed.hostname, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+    
+    async def _probe_backend(self, session: aiohttp.ClientSession, url: str,
+                             parse: Callable[[Dict], List[ModelInfo]]) -> List[ModelInfo]:
+        """GET a backend's model list, reusing the last result when it hasn't changed.
         
-        return models
+        Sends the last ETag / Last-Modified so servers that support conditional
+        requests can answer 304; otherwise an unchanged body is recognized by
+        its digest and not parsed again.
+        """
+        if not await self._port_open(url):
+            return []
+        
+        cached = self._probe_cache.get(url)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                return list(cached.models)
+            if response.status != 200:
+                return []
+            body = await response.read()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+        
+        digest = hashlib.blake2b(body, digest_size=8).digest()
+        if cached is not None and cached.digest == digest:
+            models = cached.models
+        else:
+            models = parse(_json_loads(body))
+        
+        self._probe_cache[url] = _ProbeResult(etag, last_modified, digest, models)
+        return list(models)
     
-    def _detect_local_models(self) -> List[ModelInfo]:
+    def _detect_local_models(self, force_rescan: bool = False) -> List[ModelInfo]:
         """Detect other local models (like in model directories)."""
         models = []
+        seen = set()
         
         # Common model locations
         model_dirs = [
-            Path.home() / ".ollama" / "models",
-            Path.home() / ".cache" / "huggingface" / "hub",
+            _HOME / ".ollama" / "models",
+            _HOME / ".cache" / "huggingface" / "hub",
             Path("/opt") / "models",  # Common on Linux
-            Path.home() / "models",  # User models
+            _HOME / "models",  # User models
         ]
         
+        cache = {} if force_rescan else self._load_scan_cache()
+        updated_cache = {}
+        
         for model_dir in model_dirs:
-            if model_dir.exists():
-                # Look for GGUF files (common in local LLMs)
-                for gguf_file in model_dir.rglob("*.gguf"):
-                    model_name = gguf_file.stem
-                    if not any(m.name == model_name for m in models):  # Avoid duplicates
-                        models.append(ModelInfo(
-                            name=model_name,
-                            backend="local",
-                            path=str(gguf_file)
-                        ))
+            if not model_dir.exists():
+                continue
+            
+            key = str(model_dir)
+            entry = cache.get(key)
+            if entry is None or not self._scan_is_current(entry):
+                entry = self._scan_model_dir(model_dir)
+            updated_cache[key] = entry
+            
+            for model_name, model_path in entry["models"]:
+                if model_name not in seen:  # Avoid duplicates
+                    seen.add(model_name)
+                    models.append(ModelInfo(
+                        name=model_name,
+                        backend="local",
+                        path=model_path
+                    ))
+        
+        if updated_cache != cache:
+            self._save_scan_cache(updated_cache)
         
         return models
+    
+    @staticmethod
+    def _get_scan_cache_path() -> Path:
+        """Get the path of the persisted local model scan cache."""
+        return _HOME / ".orby" / "model_cache.json"
+    
+    def _load_scan_cache(self) -> Dict:
+        """Load the local model scan cache, or an empty one if it is missing or unreadable."""
+        try:
+            return json.loads(self._get_scan_cache_path().read_text())
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_scan_cache(self, cache: Dict):
+        """Persist the local model scan cache."""
+        try:
+            cache_path = self._get_scan_cache_path()
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps(cache))
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _scan_is_current(entry: Dict) -> bool:
+        """Check that no directory in a cached scan has changed since it was taken.
+        
+        Adding or removing a file or subdirectory updates its parent's mtime,
+        so stat-ing the directories recorded by the scan is enough.
+        """
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime_ns
+                       for path, mtime_ns in entry["dirs"].items())
+        except (OSError, KeyError, AttributeError):
+            return False
+    
+    @staticmethod
+    def _scan_model_dir(model_dir: Path) -> Dict:
+        """Walk a model directory for GGUF files, recording each directory's mtime."""
+        dirs = {}
+        found = []
+        for root, _, files in os.walk(model_dir):
+            try:
+                dirs[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            # Look for GGUF files (common in local LLMs)
+            for file_name in sorted(files):
+                if file_name.endswith(".gguf"):
+                    found.append([file_name[:-len(".gguf")], os.path.join(root, file_name)])
+        return {"dirs": dirs, "models": found}
 
 
 class ModelManager:
@@ -119,10 +274,13 @@ class ModelManager:
         self.available_models: List[ModelInfo] = []
         self.current_model: Optional[ModelInfo] = None
         self.model_history: List[Tuple[str, datetime]] = []
+        self._by_name: Dict[str, ModelInfo] = {}
     
-    def refresh_models(self):
+    def refresh_models(self, force_rescan: bool = False):
         """Refresh list of available models."""
-        self.available_models = self.detector.detect_all_models()
+        self.available_models = self.detector.detect_all_models(force_rescan=force_rescan)
+        # Reversed so the first model with a given name wins, as with a linear scan
+        self._by_name = {m.name.lower(): m for m in reversed(self.available_models)}
     
     def get_models_by_backend(self) -> Dict[str, List[ModelInfo]]:
         """Group models by backend."""
@@ -135,12 +293,12 @@ class ModelManager:
     
     def switch_model(self, model_name: str) -> bool:
         """Switch to a specific model by name."""
-        for model in self.available_models:
-            if model.name.lower() == model_name.lower():
-                self.current_model = model
-                self.model_history.append((model.name, datetime.now()))
-                return True
-        return False
+        model = self._by_name.get(model_name.lower())
+        if model is None:
+            return False
+        self.current_model = model
+        self.model_history.append((model.name, datetime.now()))
+        return True
     
     def benchmark_model(self, model_name: str, test_prompt: str = "What is 2+2?") -> float:
         """Perform a basic benchmark on a model."""
@@ -156,10 +314,9 @@ class ModelManager:
             score = 0.5  # Placeholder score
             
             # Update model info with benchmark score
-            for model in self.available_models:
-                if model.name == model_name:
-                    model.benchmark_score = score
-                    break
+            model = self._by_name.get(model_name.lower())
+            if model is not None:
+                model.benchmark_score = score
             
             return score
         except Exception:
@@ -167,13 +324,12 @@ class ModelManager:
     
     def get_best_models(self, count: int = 5) -> List[ModelInfo]:
         """Get the best performing models based on benchmarks."""
-        # Sort by benchmark score (descending), then by last used (descending)
-        sorted_models = sorted(
+        # Highest benchmark score first, then most recently used
+        return heapq.nlargest(
+            count,
             self.available_models,
-            key=lambda m: (m.benchmark_score or 0, m.last_used or datetime.min),
-            reverse=True
+            key=lambda m: (m.benchmark_score or 0, m.last_used or datetime.min)
         )
-        return sorted_models[:count]
 
 
 # Global model manager instance
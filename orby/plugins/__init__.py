@@ -1,10 +1,13 @@
 """Plugin system for Orby."""
+import atexit
 import importlib.util
 import inspect
 from pathlib import Path
-from typing import Dict, List, Type, Any, Callable
+from typing import Dict, List, Type, Any, Callable, Optional, Tuple
 from abc import ABC, abstractmethod
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 
 class ToolPlugin(ABC):
@@ -33,8 +36,16 @@ class PluginManager:
     
     def __init__(self):
         self._tools: Dict[str, ToolPlugin] = {}
+        # Background event loop shared by all tool calls, started on first use
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        # User plugins can import heavy dependencies, so load them on first lookup
+        self._user_plugins_loaded = False
+        self._plugins_lock = threading.Lock()
+        # Set on threads that are executing a plugin file
+        self._importing = threading.local()
         self._load_builtin_tools()
-        self._load_user_plugins()
     
     def _load_builtin_tools(self):
         """Load built-in tools."""
@@ -53,17 +64,38 @@ class PluginManager:
         for tool in builtin_tools:
             self._tools[tool.name] = tool
     
+    def _ensure_user_plugins(self):
+        """Load user plugins once, the first time tools are looked up."""
+        if self._user_plugins_loaded or getattr(self._importing, "active", False):
+            # A plugin using the manager while it's being imported must not wait
+            # on the load that is importing it
+            return
+        with self._plugins_lock:
+            if not self._user_plugins_loaded:
+                self._load_user_plugins()
+                self._user_plugins_loaded = True
+    
     def _load_user_plugins(self):
         """Load user plugins from the plugins directory."""
         plugins_dir = Path.home() / ".orby" / "plugins"
         plugins_dir.mkdir(exist_ok=True)
         
         # Look for Python files in the plugins directory
-        for plugin_file in plugins_dir.glob("*.py"):
-            self._load_plugin_from_file(plugin_file)
+        plugin_files = list(plugins_dir.glob("*.py"))
+        if not plugin_files:
+            return
+        
+        # Import concurrently so slow plugin imports overlap, then register in
+        # file order so name clashes resolve the same way as a sequential load
+        with ThreadPoolExecutor(max_workers=min(8, len(plugin_files))) as executor:
+            for tools in executor.map(self._import_plugin_tools, plugin_files):
+                for tool_instance in tools:
+                    self._tools[tool_instance.name] = tool_instance
     
-    def _load_plugin_from_file(self, plugin_file: Path):
-        """Load a plugin from a Python file."""
+    def _import_plugin_tools(self, plugin_file: Path) -> List[ToolPlugin]:
+        """Import a plugin file and instantiate the tools it defines."""
+        tools = []
+        self._importing.active = True
         try:
             spec = importlib.util.spec_from_file_location("plugin_module", plugin_file)
             module = importlib.util.module_from_spec(spec)
@@ -78,25 +110,31 @@ class PluginManager:
                     obj != ToolPlugin
                 ):
                     try:
-                        tool_instance = obj()
-                        self._tools[tool_instance.name] = tool_instance
+                        tools.append(obj())
                     except Exception:
                         # Skip tools that can't be instantiated
                         continue
         except Exception:
             # If there's an error loading the plugin, skip it
             pass
+        finally:
+            self._importing.active = False
+        return tools
     
     def register_tool(self, tool: ToolPlugin):
         """Register a custom tool."""
+        # Load user plugins first so they can't later replace this registration
+        self._ensure_user_plugins()
         self._tools[tool.name] = tool
     
     def get_tool(self, name: str) -> ToolPlugin:
         """Get a tool by name."""
+        self._ensure_user_plugins()
         return self._tools.get(name)
     
     def list_tools(self) -> List[str]:
         """List all available tool names."""
+        self._ensure_user_plugins()
         return list(self._tools.keys())
     
     def execute_tool(self, name: str, **kwargs) -> Dict[str, Any]:
@@ -108,15 +146,63 @@ class PluginManager:
                 "error": f"Tool '{name}' not found"
             }
         
-        # Run the async execute method
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(tool.execute(**kwargs))
-        finally:
-            loop.close()
+        # Run the async execute method on the shared background loop
+        future = asyncio.run_coroutine_threadsafe(tool.execute(**kwargs), self._get_loop())
+        return future.result()
+    
+    def execute_tools_parallel(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Execute several independent tool calls concurrently.
+        
+        Takes (tool name, kwargs) pairs and returns one result per call, in order.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._gather(calls), self._get_loop())
+        return future.result()
+    
+    async def _gather(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Run tool calls together on the background loop, mapping failures to error results."""
+        async def run(name: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+            tool = self.get_tool(name)
+            if not tool:
+                return {
+                    "status": "error",
+                    "error": f"Tool '{name}' not found"
+                }
+            return await tool.execute(**kwargs)
+        
+        results = await asyncio.gather(*(run(name, kwargs) for name, kwargs in calls), return_exceptions=True)
+        return [
+            {"status": "error", "error": str(result)} if isinstance(result, Exception) else result
+            for result in results
+        ]
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the background event loop that runs tool coroutines, starting it if needed."""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="orby-plugin-loop", daemon=True)
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+            return self._loop
+    
+    def shutdown(self):
+        """Close tool resources and stop the background event loop."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
         
-        return result
+        if loop is not None:
+            for tool in self._tools.values():
+                close = getattr(tool, "close", None)
+                if close is not None and asyncio.iscoroutinefunction(close):
+                    try:
+                        asyncio.run_coroutine_threadsafe(close(), loop).result()
+                    except Exception:
+                        # A tool that fails to close shouldn't block shutdown
+                        pass
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
 
 
 class PluginAPI:
@@ -142,4 +228,6 @@ class PluginAPI:
 
 
 # Global plugin manager instance
-plugin_manager = PluginManager()
\ No newline at end of file
+plugin_manager = PluginManager()
+# Run tool close() hooks and stop the background loop when the process exits
+atexit.register(plugin_manager.shutdown)
\ No newline at end of file
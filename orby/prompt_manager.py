@@ -1,18 +1,42 @@
 """System prompt and profile management for Orby."""
-import yaml
+import atexit
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, TextIO, Tuple
 import logging
+from .config import load_yaml, save_yaml
+
+
+# (second, formatted) for the most recent log timestamp
+_timestamp_cache: Tuple[int, str] = (0, "")
+
+
+def _log_timestamp() -> str:
+    """Format the current local time, calling strftime at most once per second."""
+    global _timestamp_cache
+    now = int(time.time())
+    cached_second, formatted = _timestamp_cache
+    if now != cached_second:
+        formatted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _timestamp_cache = (now, formatted)
+    return formatted
 
 
 class PromptManager:
     """Manages system prompts and profiles for Orby."""
     
+    _LOG_FLUSH_EVERY = 16
+    
     def __init__(self):
         self.config_dir = Path.home() / '.orby'
         self.config_dir.mkdir(exist_ok=True)
         self.log_file = self.config_dir / 'prompt_log.txt'
+        self._log_fh: Optional[TextIO] = None
+        self._log_pending = 0
+        self._log_lock = threading.Lock()
+        self._profiles_cache: Optional[Tuple[int, List[str]]] = None
         
     def get_prompts_dir(self) -> Path:
         """Get the Orby prompts directory."""
@@ -28,16 +52,30 @@ class PromptManager:
     
     def log_prompt_change(self, action: str, profile: Optional[str], prompt: Optional[str] = None):
         """Log prompt changes for security and transparency."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _log_timestamp()
         profile_name = profile or "global"
         
         if action == "set":
             log_entry = f"[{timestamp}] System prompt {action} for {profile_name}: {prompt[:50]}...\n"
         else:
             log_entry = f"[{timestamp}] System prompt {action} for {profile_name}\n"
-            
-        with open(self.log_file, 'a') as f:
-            f.write(log_entry)
+        
+        with self._log_lock:
+            if self._log_fh is None:
+                self._log_fh = open(self.log_file, 'a', buffering=8192)
+                atexit.register(self.flush_log)
+            self._log_fh.write(log_entry)
+            self._log_pending += 1
+            if action == "clear" or self._log_pending >= self._LOG_FLUSH_EVERY:
+                self._log_fh.flush()
+                self._log_pending = 0
+    
+    def flush_log(self):
+        """Flush buffered prompt log entries to disk."""
+        with self._log_lock:
+            if self._log_fh is not None:
+                self._log_fh.flush()
+                self._log_pending = 0
     
     def load_system_prompt(self, profile_name: Optional[str] = None) -> Optional[str]:
         """Load the system prompt from the active profile or global config."""
@@ -47,9 +85,8 @@ class PromptManager:
             # Load from specific profile
             profile_path = self.config_dir / f'profile_{profile_name}.yml'
             if profile_path.exists():
-                with open(profile_path, 'r') as f:
-                    profile_config = yaml.safe_load(f)
-                    return profile_config.get('system_prompt')
+                profile_config = load_yaml(profile_path)
+                return profile_config.get('system_prompt')
         else:
             # Load from active config
             config = load_config()
@@ -65,11 +102,9 @@ class PromptManager:
             # Save to specific profile
             profile_path = self.config_dir / f'profile_{profile_name}.yml'
             if profile_path.exists():
-                with open(profile_path, 'r') as f:
-                    profile_config = yaml.safe_load(f)
+                profile_config = load_yaml(profile_path)
                 profile_config['system_prompt'] = prompt
-                with open(profile_path, 'w') as f:
-                    yaml.dump(profile_config, f, default_flow_style=False)
+                save_yaml(profile_config, profile_path)
             else:
                 # Create new profile with system prompt
                 default_config = {
@@ -79,8 +114,7 @@ class PromptManager:
                     'default_model': 'llama3.1:latest',
                     'system_prompt': prompt
                 }
-                with open(profile_path, 'w') as f:
-                    yaml.dump(default_config, f, default_flow_style=False)
+                save_yaml(default_config, profile_path)
             
             self.log_prompt_change("set", profile_name, prompt)
         else:
@@ -89,8 +123,7 @@ class PromptManager:
             config['system_prompt'] = prompt
             
             config_path = self.config_dir / 'config.yml'
-            with open(config_path, 'w') as f:
-                yaml.dump(config, f, default_flow_style=False)
+            save_yaml(config, config_path)
             
             self.log_prompt_change("set", None, prompt)
     
@@ -102,12 +135,10 @@ class PromptManager:
             # Clear from specific profile
             profile_path = self.config_dir / f'profile_{profile_name}.yml'
             if profile_path.exists():
-                with open(profile_path, 'r') as f:
-                    profile_config = yaml.safe_load(f)
+                profile_config = load_yaml(profile_path)
                 if 'system_prompt' in profile_config:
                     del profile_config['system_prompt']
-                    with open(profile_path, 'w') as f:
-                        yaml.dump(profile_config, f, default_flow_style=False)
+                    save_yaml(profile_config, profile_path)
                     
                     self.log_prompt_change("clear", profile_name)
         else:
@@ -117,15 +148,22 @@ class PromptManager:
                 del config['system_prompt']
                 
                 config_path = self.config_dir / 'config.yml'
-                with open(config_path, 'w') as f:
-                    yaml.dump(config, f, default_flow_style=False)
+                save_yaml(config, config_path)
                 
                 self.log_prompt_change("clear", None)
     
     def list_profiles(self) -> List[str]:
         """List all available profiles."""
-        profile_files = list(self.config_dir.glob('profile_*.yml'))
-        return [f.stem.replace('profile_', '') for f in profile_files]
+        # Adding, removing or renaming a profile bumps the directory mtime
+        mtime_ns = os.stat(self.config_dir).st_mtime_ns
+        if self._profiles_cache is None or self._profiles_cache[0] != mtime_ns:
+            with os.scandir(self.config_dir) as it:
+                names = [
+                    e.name[len('profile_'):-len('.yml')] for e in it
+                    if e.name.startswith('profile_') and e.name.endswith('.yml')
+                ]
+            self._profiles_cache = (mtime_ns, names)
+        return list(self._profiles_cache[1])
     
     def create_profile(self, profile_name: str, system_prompt: Optional[str] = None):
         """Create a new profile with optional system prompt."""
@@ -144,8 +182,7 @@ class PromptManager:
         if system_prompt:
             default_config['system_prompt'] = system_prompt
         
-        with open(profile_path, 'w') as f:
-            yaml.dump(default_config, f, default_flow_style=False)
+        save_yaml(default_config, profile_path)
         
         if system_prompt:
             self.log_prompt_change("set", profile_name, system_prompt)
@@ -158,21 +195,32 @@ class PromptManager:
             raise ValueError(f"Profile '{profile_name}' does not exist.")
         
         # Read the profile config
-        with open(profile_path, 'r') as f:
-            profile_config = yaml.safe_load(f)
+        profile_config = load_yaml(profile_path)
         
         # Save it as the main config
         main_config_path = self.config_dir / 'config.yml'
-        with open(main_config_path, 'w') as f:
-            yaml.dump(profile_config, f, default_flow_style=False)
+        save_yaml(profile_config, main_config_path)
     
     def get_prompt_history(self) -> List[str]:
         """Get recent prompt changes from the log."""
+        self.flush_log()
         if not self.log_file.exists():
             return []
         
-        with open(self.log_file, 'r') as f:
-            lines = f.readlines()
+        # Read backwards from the end, widening the window until it holds 10 entries
+        with open(self.log_file, 'rb') as f:
+            size = f.seek(0, 2)
+            window = 4096
+            while True:
+                start = max(0, size - window)
+                f.seek(start)
+                lines = f.read().decode('utf-8', 'replace').splitlines(keepends=True)
+                if start > 0:
+                    # The first line is probably cut off
+                    lines = lines[1:]
+                if len(lines) >= 10 or start == 0:
+                    break
+                window *= 2
         
         # Return last 10 entries
         return lines[-10:]
\ No newline at end of file
@@ -1,18 +1,28 @@
 """Built-in tools for Orby."""
 import subprocess
-import tempfile
-import os
 import sys
 from typing import Dict, Any, Optional
 import aiohttp
 import asyncio
 from pathlib import Path
 from ..core import Tool, ToolCall, ToolCallStatus
+from ..utils.command import split_simple_command
+from ..utils.patterns import compile_literals
+
+# Resolved once; the safety checks compare against fully resolved paths
+_HOME = Path.home().resolve()
 
 
 class ShellTool(Tool):
     """Tool to execute shell commands."""
     
+    _DANGER_RE = compile_literals([
+        'rm -rf', 'rm -r', 'rm -f', 'rmdir',
+        'mkfs', 'dd if=', '>/dev/',
+        'chmod 777', 'chmod -R 777',
+        'chown -R root', 'passwd', 'shadow'
+    ])
+    
     def __init__(self):
         super().__init__(
             name="shell",
@@ -30,13 +40,22 @@ class ShellTool(Tool):
                     "output": ""
                 }
             
-            result = subprocess.run(
-                command,
-                shell=True,
+            run_kwargs = dict(
                 capture_output=True,
                 text=True,
                 timeout=timeout
             )
+            result = None
+            argv = split_simple_command(command)
+            if argv is not None:
+                # Simple commands skip the extra /bin/sh fork
+                try:
+                    result = subprocess.run(argv, **run_kwargs)
+                except OSError:
+                    # e.g. a script without a shebang line, which sh still runs
+                    result = None
+            if result is None:
+                result = subprocess.run(command, shell=True, **run_kwargs)
             
             return {
                 "status": "success",
@@ -60,15 +79,7 @@ class ShellTool(Tool):
     
     def _is_dangerous_command(self, command: str) -> bool:
         """Check if command contains dangerous operations."""
-        dangerous_patterns = [
-            'rm -rf', 'rm -r', 'rm -f', 'rmdir',
-            'mkfs', 'dd if=', '>/dev/',
-            'chmod 777', 'chmod -R 777',
-            'chown -R root', 'passwd', 'shadow'
-        ]
-        
-        cmd_lower = command.lower()
-        return any(pattern in cmd_lower for pattern in dangerous_patterns)
+        return self._DANGER_RE.search(command) is not None
 
 
 class CodeTool(Tool):
@@ -84,28 +95,21 @@ class CodeTool(Tool):
         """Execute code in a sandboxed environment."""
         try:
             if language.lower() == "python":
-                # Create a temporary file for the code
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                    f.write(code)
-                    temp_file = f.name
+                result = subprocess.run(
+                    [sys.executable, "-"],
+                    input=code,
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
                 
-                try:
-                    result = subprocess.run(
-                        [sys.executable, temp_file],
-                        capture_output=True,
-                        text=True,
-                        timeout=timeout
-                    )
-                    
-                    return {
-                        "status": "success",
-                        "stdout": result.stdout,
-                        "stderr": result.stderr,
-                        "return_code": result.returncode,
-                        "output": result.stdout + result.stderr
-                    }
-                finally:
-                    os.unlink(temp_file)
+                return {
+                    "status": "success",
+                    "stdout": result.stdout,
+                    "stderr": result.stderr,
+                    "return_code": result.returncode,
+                    "output": result.stdout + result.stderr
+                }
             else:
                 return {
                     "status": "error",
@@ -143,7 +147,7 @@ class FileTool(Tool):
             
             # Security check: prevent directory traversal
             if ".." in path or str(path_obj).startswith("/"):
-                if not str(path_obj).startswith(Path.home().resolve()):
+                if not path_obj.is_relative_to(_HOME):
                     return {
                         "status": "error",
                         "error": "Path outside home directory is not allowed",
@@ -220,13 +224,23 @@ class WebTool(Tool):
             description="Fetch web content and perform web operations"
         )
 
-    async def execute(self, operation: str, url: str, **kwargs) -> Dict[str, Any]:
+    async def execute(self, operation: str, url: str, max_size: int = 10*1024*1024, **kwargs) -> Dict[str, Any]:
         """Execute web operations."""
         if operation == "fetch":
             try:
                 async with aiohttp.ClientSession() as session:
                     async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                        content = await response.text()
+                        # Stream the body so oversized responses are abandoned early
+                        body = bytearray()
+                        async for chunk in response.content.iter_chunked(65536):
+                            body.extend(chunk)
+                            if len(body) > max_size:
+                                return {
+                                    "status": "error",
+                                    "error": f"Content too large (>{max_size} bytes)",
+                                    "output": ""
+                                }
+                        content = body.decode(response.charset or 'utf-8', errors='replace')
                         
                         return {
                             "status": "success",
@@ -1,24 +1,319 @@
 """Enhanced code execution for Orby."""
+import asyncio
+import json
+import shutil
+import signal
 import subprocess
 import sys
+import threading
 import tempfile
 import os
 import time
-from typing import Dict, Any
-from datetime import datetime
-from pathlib import Path
+from typing import Dict, Any, List, Optional
 from ..core import Tool
+from .execution_log import execution_log
+from ..utils.patterns import compile_literals
+
+
+# Most output kept from each of a snippet's stdout and stderr
+_MAX_CAPTURE = 1024 * 1024
+
+
+async def _read_capped(stream: asyncio.StreamReader, limit: int = _MAX_CAPTURE) -> str:
+    """Drain a pipe, keeping only the first limit bytes."""
+    data = bytearray()
+    dropped = 0
+    while chunk := await stream.read(65536):
+        room = limit - len(data)
+        if room > 0:
+            data.extend(chunk[:room])
+        dropped += max(0, len(chunk) - max(room, 0))
+    text = data.decode(errors="replace")
+    if dropped:
+        text += f"\n[... {dropped} more bytes truncated]"
+    return text
+
+
+async def _run_process(*args: str, timeout: float, input: Optional[bytes] = None, **kwargs) -> Dict[str, Any]:
+    """Run a process without blocking the event loop, killing it on timeout."""
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **kwargs
+    )
+    
+    async def feed():
+        if input is not None:
+            proc.stdin.write(input)
+            await proc.stdin.drain()
+            proc.stdin.close()
+    
+    try:
+        _, stdout, stderr, _ = await asyncio.wait_for(
+            asyncio.gather(feed(), _read_capped(proc.stdout), _read_capped(proc.stderr), proc.wait()),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return {
+        "status": "success",
+        "stdout": stdout,
+        "stderr": stderr,
+        "return_code": proc.returncode,
+        "output": stdout + stderr
+    }
+
+
+# Runs inside each pooled interpreter: one JSON request per line on stdin,
+# one JSON result per line on the original stdout.
+_WORKER_SOURCE = """
+import atexit, json, os, signal, sys, tempfile, traceback
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+def _limit(kind, value):
+    soft, hard = resource.getrlimit(kind)
+    if hard != resource.RLIM_INFINITY:
+        value = min(value, hard)
+    try:
+        resource.setrlimit(kind, (value, value))
+    except (ValueError, OSError):
+        pass
+
+# Kernel-enforced limits, applied before any snippet runs
+if resource is not None:
+    _limit(resource.RLIMIT_AS, 512 * 1024 * 1024)
+    _limit(resource.RLIMIT_FSIZE, 64 * 1024 * 1024)
+    _limit(resource.RLIMIT_NOFILE, 32)
+
+if hasattr(signal, "SIGXFSZ"):
+    # Output past the file size limit fails the write instead of killing the worker
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+
+# Snippets can write to fds 1 and 2 directly (os.write, subprocesses, C
+# extensions) and read fd 0, so the protocol moves to private copies and the
+# standard fds are pointed elsewhere
+_requests = os.fdopen(os.dup(0), "r")
+_responses = os.fdopen(os.dup(1), "w")
+_null = os.open(os.devnull, os.O_RDWR)
+os.dup2(_null, 0)
+os.dup2(_null, 1)
+os.close(_null)
+
+def _read_capture(f, limit=%d):
+    size = os.fstat(f.fileno()).st_size
+    f.seek(0)
+    text = f.read(limit).decode("utf-8", "replace")
+    if size > limit:
+        text += "\\n[... %%d more bytes truncated]" %% (size - limit)
+    return text
+
+def _flush():
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+
+def _execute(code):
+    try:
+        exec(compile(code, "<stdin>", "exec"), {"__name__": "__main__", "__builtins__": __builtins__})
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException as e:
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return 1
+    return 0
+
+def _run_child(code, out, err):
+    return_code = 1
+    try:
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        return_code = _execute(code)
+        atexit._run_exitfuncs()
+        _flush()
+    finally:
+        os._exit(return_code & 0xFF)
+
+def _run(code):
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        if hasattr(os, "fork"):
+            # Each snippet runs in a forked copy of this warm interpreter, so nothing
+            # it changes (modules, sys.path, os.environ, cwd, builtins) outlives it
+            pid = os.fork()
+            if pid == 0:
+                _run_child(code, out, err)
+            return_code = os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+        else:
+            # No fork (Windows): run here; the pool retires this worker afterwards
+            os.dup2(out.fileno(), 1)
+            os.dup2(err.fileno(), 2)
+            return_code = _execute(code)
+            _flush()
+        return {"stdout": _read_capture(out), "stderr": _read_capture(err), "return_code": return_code}
+
+def _serve(requests, responses):
+    for line in iter(requests.readline, ""):
+        result = _run(json.loads(line)["code"])
+        responses.write(json.dumps(result) + "\\n")
+        responses.flush()
+
+_serve(_requests, _responses)
+""" % _MAX_CAPTURE
+
+# Process-static launch settings for the Python workers
+_PY_ARGV = (sys.executable, "-c", _WORKER_SOURCE)
+# Limit environment exposure
+_PY_ENV = {
+    "PYTHONPATH": ".",
+    "HOME": os.environ.get("HOME", ""),
+    "TMPDIR": tempfile.gettempdir()
+}
+
+
+class _CodeWorker:
+    """A persistent Python interpreter that executes snippets sent over a pipe."""
+    
+    def __init__(self, env: Dict[str, str]):
+        self.tasks = 0
+        self.proc = subprocess.Popen(
+            _PY_ARGV,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env=env,
+            # Own process group so a kill also reaches a running snippet's fork
+            start_new_session=hasattr(os, "killpg")
+        )
+    
+    def run(self, code: str) -> Dict[str, Any]:
+        """Execute a snippet and return its captured output (blocking)."""
+        self.proc.stdin.write(json.dumps({"code": code}) + "\n")
+        self.proc.stdin.flush()
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError("Code worker exited unexpectedly")
+        self.tasks += 1
+        return json.loads(line)
+    
+    def kill(self):
+        """Terminate the worker process."""
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        elif self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+
+
+class CodeWorkerPool:
+    """Keeps warm Python interpreters around so snippets don't pay interpreter startup."""
+    
+    # Snippets run in a fresh fork and leave the worker untouched; recycling only
+    # bounds slow growth. Without fork they run in the worker itself, so it is
+    # used once.
+    _MAX_TASKS_PER_WORKER = 100 if hasattr(os, "fork") else 1
+    
+    def __init__(self, env: Dict[str, str], size: int = 2):
+        self._env = env
+        self._size = size
+        self._idle: List[_CodeWorker] = []
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> _CodeWorker:
+        """Take an idle worker, starting a new one if none is free."""
+        worker = None
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.pop()
+                if candidate.proc.poll() is None:
+                    worker = candidate
+                    break
+        if worker is None:
+            worker = _CodeWorker(self._env)
+        # Keep one booting in the background so the next call finds it warm
+        self._replenish()
+        return worker
+    
+    def _replenish(self):
+        """Start a spare worker if none is idle."""
+        with self._lock:
+            if self._idle:
+                return
+            self._idle.append(_CodeWorker(self._env))
+    
+    def release(self, worker: _CodeWorker):
+        """Return a healthy worker to the pool, or retire it."""
+        with self._lock:
+            if worker.tasks < self._MAX_TASKS_PER_WORKER and len(self._idle) < self._size:
+                self._idle.append(worker)
+                return
+        worker.kill()
+        self._replenish()
+    
+    async def run(self, code: str, timeout: float) -> Dict[str, Any]:
+        """Execute a snippet on a pooled worker, killing the worker on timeout or failure."""
+        worker = self.acquire()
+        try:
+            result = await asyncio.wait_for(asyncio.to_thread(worker.run, code), timeout=timeout)
+        except BaseException:
+            # Killing the process also unblocks the reader thread
+            worker.kill()
+            self._replenish()
+            raise
+        self.release(worker)
+        return result
+    
+    def close(self):
+        """Terminate all idle workers."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
 
 
 class CodeTool(Tool):
     """Enhanced tool for safe code execution with sandboxing."""
     
+    _DANGEROUS_PYTHON_RE = compile_literals([
+        'import os', 'import sys', 'import subprocess', 'import shutil',
+        '__import__', 'eval(', 'exec(', 'compile(',
+        'open(', 'file(',
+        'globals()', 'locals()',
+        'getattr(', 'setattr(',
+        'delattr(',
+        'execfile', '__file__',
+        'eval'
+    ])
+    
+    # Resolved Node.js executable, looked up on first JavaScript run
+    _node_path: Optional[str] = None
+    
     def __init__(self):
         super().__init__(
             name="code",
             description="Execute code in a safe sandboxed environment",
             permissions_required=["execute", "code"]
         )
+        self._python_workers = CodeWorkerPool(env=_PY_ENV)
+    
+    async def close(self):
+        """Shut down the pooled Python workers."""
+        self._python_workers.close()
 
     async def execute(self, code: str, language: str = "python", timeout: int = 30, **kwargs) -> Dict[str, Any]:
         """Execute code with safety checks and logging."""
@@ -77,52 +372,20 @@ class CodeTool(Tool):
     async def _execute_python(self, code: str, timeout: int = 30) -> Dict[str, Any]:
         """Execute Python code in a secure environment."""
         try:
-            # Create a temporary file for the code
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            # Execute in a restricted environment
-            result = subprocess.run(
-                [sys.executable, "-c", f"import sys; sys.path.insert(0, '.'); exec(open('{temp_file}').read())"],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                # Limit environment exposure
-                env={
-                    "PYTHONPATH": ".",
-                    "HOME": os.environ.get("HOME", ""),
-                    "TMPDIR": tempfile.gettempdir()
-                }
-            )
-            
-            # Clean up
-            os.unlink(temp_file)
-            
+            # Execute on a warm interpreter running in a restricted environment
+            result = await self._python_workers.run(code, timeout)
             return {
                 "status": "success",
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "return_code": result.returncode,
-                "output": result.stdout + result.stderr
+                **result,
+                "output": result["stdout"] + result["stderr"]
             }
-        except subprocess.TimeoutExpired:
-            if 'temp_file' in locals():
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass  # File might not exist
+        except asyncio.TimeoutError:
             return {
                 "status": "error",
                 "error": f"Python code execution timed out after {timeout} seconds",
                 "output": ""
             }
-        except Exception as e:
-            if 'temp_file' in locals():
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
+        except (OSError, RuntimeError, ValueError) as e:
             return {
                 "status": "error",
                 "error": f"Python execution failed: {str(e)}",
@@ -131,63 +394,26 @@ class CodeTool(Tool):
     
     async def _execute_javascript(self, code: str, timeout: int = 30) -> Dict[str, Any]:
         """Execute JavaScript code using Node.js if available."""
-        # Check if node is available
-        try:
-            node_result = subprocess.run(["node", "--version"], capture_output=True, text=True, timeout=5)
-            if node_result.returncode != 0:
+        # Check if node is available; a PATH lookup, no process spawned
+        if CodeTool._node_path is None:
+            CodeTool._node_path = shutil.which("node")
+            if CodeTool._node_path is None:
                 return {
                     "status": "error",
-                    "error": "Node.js is not available on this system",
+                    "error": "Node.js is not installed or not in PATH",
                     "output": ""
                 }
-        except FileNotFoundError:
-            return {
-                "status": "error",
-                "error": "Node.js is not installed or not in PATH",
-                "output": ""
-            }
         
         try:
-            # Create a temporary file for the code
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            # Execute JavaScript code
-            result = subprocess.run(
-                ["node", temp_file],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            
-            # Clean up
-            os.unlink(temp_file)
-            
-            return {
-                "status": "success",
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "return_code": result.returncode,
-                "output": result.stdout + result.stderr
-            }
-        except subprocess.TimeoutExpired:
-            if 'temp_file' in locals():
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
+            # Execute JavaScript code read from stdin
+            return await _run_process(CodeTool._node_path, "-", timeout=timeout, input=code.encode())
+        except asyncio.TimeoutError:
             return {
                 "status": "error",
                 "error": f"JavaScript execution timed out after {timeout} seconds",
                 "output": ""
             }
-        except Exception as e:
-            if 'temp_file' in locals():
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
+        except OSError as e:
             return {
                 "status": "error",
                 "error": f"JavaScript execution failed: {str(e)}",
@@ -206,24 +432,12 @@ class CodeTool(Tool):
     def _validate_code(self, code: str, language: str) -> Dict[str, Any]:
         """Validate code for dangerous operations."""
         if language.lower() == "python":
-            dangerous_patterns = [
-                'import os', 'import sys', 'import subprocess', 'import shutil',
-                '__import__', 'eval(', 'exec(', 'compile(',
-                'open(', 'file(',
-                'globals()', 'locals()',
-                'getattr(', 'setattr(',
-                'delattr(',
-                'execfile', '__file__',
-                'compile(', 'eval'
-            ]
-            
-            code_lower = code.lower()
-            for pattern in dangerous_patterns:
-                if pattern in code_lower:
-                    return {
-                        "valid": False,
-                        "error": f"Code contains potentially dangerous operation: {pattern}"
-                    }
+            match = self._DANGEROUS_PYTHON_RE.search(code)
+            if match:
+                return {
+                    "valid": False,
+                    "error": f"Code contains potentially dangerous operation: {match.group(0).lower()}"
+                }
         
         # Check for excessive length
         if len(code) > 10000:  # 10KB limit
@@ -234,22 +448,10 @@ class CodeTool(Tool):
         
         return {"valid": True, "error": ""}
     
-    def requires_confirmation(self) -> bool:
+    def requires_confirmation(self, **kwargs) -> bool:
         """Code execution requires confirmation as it's a potentially dangerous operation."""
         return True
     
     def _log_execution(self, tool_name: str, details: Dict[str, Any], start_time: float, status: str = "started"):
         """Log tool execution to file for transparency."""
-        log_dir = Path.home() / ".orby" / "logs"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        log_file = log_dir / f"tool_execution_{datetime.now().strftime('%Y-%m-%d')}.log"
-        
-        try:
-            with open(log_file, 'a') as f:
-                timestamp = datetime.now().isoformat()
-                log_entry = f"[{timestamp}] {status.upper()} - {tool_name}: {details}\n"
-                f.write(log_entry)
-        except Exception:
-            # If logging fails, continue execution
-            pass
\ No newline at end of file
+        execution_log.write(tool_name, details, status)
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""Buffered tool execution log shared by Orby's tools."""
+import atexit
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+
+class ExecutionLog:
+    """Appends tool execution entries to a daily log file through one open handle.
+
+    Entries are buffered and written every FLUSH_EVERY entries or FLUSH_INTERVAL
+    seconds, whichever comes first, and on interpreter exit. Timed flushes come
+    from one long-lived daemon thread, started on the first write.
+    """
+
+    FLUSH_EVERY = 100
+    FLUSH_INTERVAL = 0.25
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._fh: Optional[TextIO] = None
+        self._date = ""
+        self._fh_date = ""
+        # Set while entries are buffered; the flusher sleeps on it between batches
+        self._pending = threading.Event()
+        self._closing = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        # Local-time formatting for the most recent whole second
+        self._second = -1
+        self._second_prefix = ""
+        self._second_date = ""
+        atexit.register(self.close)
+
+    def write(self, tool_name: str, details: Dict[str, Any], status: str = "started"):
+        """Queue a log entry."""
+        with self._lock:
+            timestamp, date = self._timestamp()
+            entry = f"[{timestamp}] {status.upper()} - {tool_name}: {details}\n"
+            if date != self._date:
+                # Entries from the previous day belong in the previous file
+                self._flush_locked()
+                self._date = date
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.FLUSH_EVERY or self._closing.is_set():
+                self._flush_locked()
+                return
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name="orby-log-flusher", daemon=True)
+                self._flusher.start()
+            self._pending.set()
+
+    def _run_flusher(self):
+        """Flush FLUSH_INTERVAL seconds after entries start buffering, until closed."""
+        while not self._closing.is_set():
+            self._pending.wait()
+            # Let the batch fill for one interval; close() cuts the wait short
+            self._closing.wait(self.FLUSH_INTERVAL)
+            self.flush()
+
+    def _timestamp(self) -> Tuple[str, str]:
+        """ISO-format the current local time and date, calling strftime once per second."""
+        second, nanos = divmod(time.time_ns(), 1_000_000_000)
+        if second != self._second:
+            local = time.localtime(second)
+            self._second = second
+            self._second_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', local)
+            self._second_date = self._second_prefix[:10]
+        micros = nanos // 1000
+        # datetime.isoformat() omits the fraction when it is zero
+        timestamp = f"{self._second_prefix}.{micros:06d}" if micros else self._second_prefix
+        return timestamp, self._second_date
+
+    def flush(self):
+        """Write out any buffered entries."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """Flush remaining entries and release the file handle (runs at exit)."""
+        with self._lock:
+            self._closing.set()
+            # Wake the flusher so it sees the close and exits
+            self._pending.set()
+            self._flush_locked()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def _flush_locked(self):
+        """Write buffered entries to the current day's file; caller holds the lock."""
+        if not self._closing.is_set():
+            self._pending.clear()
+        if not self._buffer:
+            return
+
+        entries, self._buffer = self._buffer, []
+        try:
+            if self._fh is None or self._fh_date != self._date:
+                if self._fh is not None:
+                    self._fh.close()
+                    self._fh = None
+                self.log_dir.mkdir(parents=True, exist_ok=True)
+                self._fh = open(self.log_dir / f"tool_execution_{self._date}.log", 'a')
+                self._fh_date = self._date
+            # One write call per batch
+            self._fh.write("".join(entries))
+            self._fh.flush()
+            if self._closing.is_set():
+                # Entries logged during shutdown; don't leave the handle open
+                self._fh.close()
+                self._fh = None
+        except Exception:
+            # If logging fails, continue execution
+            pass
+
+
+execution_log = ExecutionLog(Path.home() / ".orby" / "logs")
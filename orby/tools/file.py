@@ -1,10 +1,24 @@
 """Enhanced file operations for Orby."""
+import asyncio
+import errno
 import os
-from pathlib import Path
+from stat import S_ISDIR, S_ISREG
 from typing import Dict, Any, Optional
-from datetime import datetime
 import time
 from ..core import Tool
+from .execution_log import execution_log
+
+# Resolved once; the safety checks compare against fully resolved paths
+_HOME = os.path.realpath(os.path.expanduser("~"))
+_SAFE_SYSTEM_ROOTS = tuple(os.path.realpath(p) for p in ("/tmp", "/var/tmp"))
+
+# Operations that never modify the filesystem
+_READ_ONLY_OPS = frozenset({"read", "list", "info", "exists"})
+
+
+def _is_within(path: str, root: str) -> bool:
+    """Whether a resolved path is root itself or below it (plain string check)."""
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
 
 
 class FileTool(Tool):
@@ -16,9 +30,19 @@ class FileTool(Tool):
             description="Read, write, and manipulate files with safety checks",
             permissions_required=["read", "write", "file"]
         )
+        self._ops = {
+            "read": self._read_file,
+            "write": self._write_file,
+            "list": self._list_directory,
+            "delete": self._delete_file,
+            "info": self._get_file_info,
+            "exists": self._check_exists,
+        }
+        # Orby never changes directory, so the resolved cwd is read once
+        self._cwd = os.path.realpath(os.getcwd())
 
     async def execute(self, operation: str, path: str, content: Optional[str] = None, 
-                     **kwargs) -> Dict[str, Any]:
+                     offset: int = 0, max_bytes: Optional[int] = None, **kwargs) -> Dict[str, Any]:
         """Execute file operations with safety checks and logging."""
         start_time = time.time()
         
@@ -27,8 +51,8 @@ class FileTool(Tool):
         
         try:
             # Secure path resolution
-            path_obj = self._secure_path_resolution(path)
-            if not path_obj:
+            resolved = self._secure_path_resolution(path)
+            if not resolved:
                 self._log_execution("file", {"operation": operation, "path": path, "error": "invalid_path"}, start_time, "error")
                 return {
                     "status": "error",
@@ -37,7 +61,7 @@ class FileTool(Tool):
                 }
             
             # Check if path is inside safe directory
-            if not self._is_path_safe(path_obj):
+            if not self._is_path_safe(resolved):
                 self._log_execution("file", {"operation": operation, "path": path, "error": "unsafe_path"}, start_time, "error")
                 return {
                     "status": "error",
@@ -45,18 +69,16 @@ class FileTool(Tool):
                     "output": ""
                 }
             
-            if operation == "read":
-                result = await self._read_file(path_obj)
-            elif operation == "write":
-                result = await self._write_file(path_obj, content)
-            elif operation == "list":
-                result = await self._list_directory(path_obj)
-            elif operation == "delete":
-                result = await self._delete_file(path_obj)
-            elif operation == "info":
-                result = await self._get_file_info(path_obj)
-            elif operation == "exists":
-                result = await self._check_exists(path_obj)
+            handler = self._ops.get(operation)
+            if handler is not None:
+                if operation == "read":
+                    args = (offset, max_bytes)
+                elif operation == "write":
+                    args = (content,)
+                else:
+                    args = ()
+                # Disk I/O runs on a worker thread so it doesn't block the event loop
+                result = await asyncio.to_thread(handler, resolved, *args)
             else:
                 result = {
                     "status": "error",
@@ -66,7 +88,7 @@ class FileTool(Tool):
             
             # Log successful operation
             execution_time = time.time() - start_time
-            log_details = {"operation": operation, "path": str(path_obj), "status": result["status"]}
+            log_details = {"operation": operation, "path": resolved, "status": result["status"]}
             if result["status"] == "success":
                 self._log_execution("file", log_details, start_time, "completed")
             else:
@@ -86,95 +108,108 @@ class FileTool(Tool):
                 "execution_time": execution_time
             }
     
-    def _secure_path_resolution(self, path: str) -> Optional[Path]:
+    def _secure_path_resolution(self, path: str) -> Optional[str]:
         """Resolve path securely, preventing directory traversal."""
         try:
             # Prevent common traversal attempts
             if '..' in path.replace('\\', '/').replace('//', '/').split('/'):
                 # If there are traversal attempts, resolve relative to current or home directory
-                path = Path.cwd() / path.lstrip('./')
+                path = os.path.join(os.getcwd(), path.lstrip('./'))
             
-            path_obj = Path(path).resolve()
-            return path_obj
+            return os.path.realpath(path)
         except Exception:
             return None
     
-    def _is_path_safe(self, path_obj: Path) -> bool:
+    def _is_path_safe(self, path: str) -> bool:
         """Check if path is in a safe location."""
-        home_path = Path.home()
-        
-        # Check if path is within home directory or current working directory
-        try:
-            path_obj.relative_to(home_path)
-            return True
-        except ValueError:
-            pass
-        
+        # Allow the home directory, the current working directory, and
+        # specific safe system paths
+        return (
+            _is_within(path, _HOME) or
+            _is_within(path, self._cwd) or
+            any(_is_within(path, root) for root in _SAFE_SYSTEM_ROOTS)
+        )
+    
+    @staticmethod
+    def _stat(path: str) -> Optional[os.stat_result]:
+        """Stat a path once, returning None if it doesn't exist."""
         try:
-            path_obj.relative_to(Path.cwd())
-            return True
-        except ValueError:
-            pass
-        
-        # Only allow specific safe system paths
-        safe_system_paths = ["/tmp", "/var/tmp"]
-        for safe_path in safe_system_paths:
-            try:
-                path_obj.relative_to(Path(safe_path))
-                return True
-            except ValueError:
-                pass
-        
-        return False
+            return os.stat(path)
+        except OSError as e:
+            # Same errors Path.exists() treats as "doesn't exist"
+            if e.errno in (errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP):
+                return None
+            raise
     
-    async def _read_file(self, path_obj: Path) -> Dict[str, Any]:
-        """Read a file."""
-        if not path_obj.exists():
+    def _read_file(self, path: str, offset: int = 0, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """Read a file, or max_bytes of it starting at offset."""
+        st = self._stat(path)
+        if st is None:
             return {
                 "status": "error",
-                "error": f"File does not exist: {path_obj}",
+                "error": f"File does not exist: {path}",
                 "output": ""
             }
         
-        if not path_obj.is_file():
+        if not S_ISREG(st.st_mode):
             return {
                 "status": "error",
-                "error": f"Path is not a file: {path_obj}",
+                "error": f"Path is not a file: {path}",
                 "output": ""
             }
         
         try:
-            # Check file size to prevent reading huge files
-            if path_obj.stat().st_size > 10 * 1024 * 1024:  # 10MB limit
+            offset = max(0, offset)
+            length = max(0, st.st_size - offset)
+            if max_bytes is not None:
+                length = min(length, max(0, max_bytes))
+            
+            # Check read size to prevent reading huge files
+            if length > 10 * 1024 * 1024:  # 10MB limit
                 return {
                     "status": "error",
-                    "error": f"File too large to read (>{10*1024*1024} bytes): {path_obj}",
+                    "error": f"File too large to read (>{10*1024*1024} bytes): {path}",
                     "output": ""
                 }
             
-            with open(path_obj, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            # Read just the requested slice in one call on a raw descriptor,
+            # then decode the whole buffer at once
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            try:
+                if hasattr(os, "pread"):
+                    data = os.pread(fd, length, offset)
+                else:
+                    os.lseek(fd, offset, os.SEEK_SET)
+                    data = os.read(fd, length)
+            finally:
+                os.close(fd)
+            
+            content = data.decode('utf-8', errors='ignore')
+            if '\r' in content:
+                # Match text-mode reads, which translate newlines
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
             
             return {
                 "status": "success",
                 "content": content,
                 "size": len(content),
-                "output": f"Read {len(content)} characters from {path_obj}"
+                "file_size": st.st_size,
+                "output": f"Read {len(content)} characters from {path}"
             }
         except PermissionError:
             return {
                 "status": "error",
-                "error": f"Permission denied reading file: {path_obj}",
+                "error": f"Permission denied reading file: {path}",
                 "output": ""
             }
-        except Exception as e:
+        except OSError as e:
             return {
                 "status": "error",
-                "error": f"Could not read file {path_obj}: {str(e)}",
+                "error": f"Could not read file {path}: {str(e)}",
                 "output": str(e)
             }
     
-    async def _write_file(self, path_obj: Path, content: Optional[str]) -> Dict[str, Any]:
+    def _write_file(self, path: str, content: Optional[str]) -> Dict[str, Any]:
         """Write to a file."""
         if content is None:
             return {
@@ -184,183 +219,191 @@ class FileTool(Tool):
             }
         
         try:
-            # Create parent directories if they don't exist
-            path_obj.parent.mkdir(parents=True, exist_ok=True)
+            if os.linesep != '\n':
+                # Match text-mode writes, which translate newlines
+                content_to_write = content.replace('\n', os.linesep)
+            else:
+                content_to_write = content
+            data = memoryview(content_to_write.encode('utf-8'))
             
-            with open(path_obj, 'w', encoding='utf-8') as f:
-                f.write(content)
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+            try:
+                fd = os.open(path, flags, 0o666)
+            except FileNotFoundError:
+                # Create parent directories only when they're actually missing
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd = os.open(path, flags, 0o666)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
             
             return {
                 "status": "success",
-                "output": f"Wrote {len(content)} characters to {path_obj}"
+                "output": f"Wrote {len(content)} characters to {path}"
             }
         except PermissionError:
             return {
                 "status": "error",
-                "error": f"Permission denied writing to file: {path_obj}",
+                "error": f"Permission denied writing to file: {path}",
                 "output": ""
             }
-        except Exception as e:
+        except OSError as e:
             return {
                 "status": "error",
-                "error": f"Could not write to file {path_obj}: {str(e)}",
+                "error": f"Could not write to file {path}: {str(e)}",
                 "output": str(e)
             }
     
-    async def _list_directory(self, path_obj: Path) -> Dict[str, Any]:
+    def _list_directory(self, path: str) -> Dict[str, Any]:
         """List directory contents."""
-        if not path_obj.exists():
+        st = self._stat(path)
+        if st is None:
             return {
                 "status": "error",
-                "error": f"Path does not exist: {path_obj}",
+                "error": f"Path does not exist: {path}",
                 "output": ""
             }
         
-        if not path_obj.is_dir():
+        if not S_ISDIR(st.st_mode):
             return {
                 "status": "error",
-                "error": f"Path is not a directory: {path_obj}",
+                "error": f"Path is not a directory: {path}",
                 "output": ""
             }
         
         try:
             files = []
-            for item in path_obj.iterdir():
-                # Skip hidden files by default for security/safety
-                if item.name.startswith('.'):
-                    continue
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    # Skip hidden files by default for security/safety
+                    if entry.name.startswith('.'):
+                        continue
                     
-                item_info = {
-                    "name": item.name,
-                    "path": str(item),
-                    "type": "directory" if item.is_dir() else "file",
-                    "size": item.stat().st_size if item.is_file() else 0,
-                    "modified": item.stat().st_mtime
-                }
-                files.append(item_info)
+                    # One stat per entry, reused for type, size and mtime
+                    entry_stat = entry.stat()
+                    item_info = {
+                        "name": entry.name,
+                        "path": entry.path,
+                        "type": "directory" if S_ISDIR(entry_stat.st_mode) else "file",
+                        "size": entry_stat.st_size if S_ISREG(entry_stat.st_mode) else 0,
+                        "modified": entry_stat.st_mtime
+                    }
+                    files.append(item_info)
             
             return {
                 "status": "success",
                 "files": files,
                 "count": len(files),
-                "output": f"Directory {path_obj} contains {len(files)} visible items"
+                "output": f"Directory {path} contains {len(files)} visible items"
             }
         except PermissionError:
             return {
                 "status": "error",
-                "error": f"Permission denied listing directory: {path_obj}",
+                "error": f"Permission denied listing directory: {path}",
                 "output": ""
             }
-        except Exception as e:
+        except OSError as e:
             return {
                 "status": "error",
-                "error": f"Could not list directory {path_obj}: {str(e)}",
+                "error": f"Could not list directory {path}: {str(e)}",
                 "output": str(e)
             }
     
-    async def _delete_file(self, path_obj: Path) -> Dict[str, Any]:
+    def _delete_file(self, path: str) -> Dict[str, Any]:
         """Delete a file."""
-        if not path_obj.exists():
+        st = self._stat(path)
+        if st is None:
             return {
                 "status": "error",
-                "error": f"File does not exist: {path_obj}",
+                "error": f"File does not exist: {path}",
                 "output": ""
             }
         
-        if path_obj.is_dir():
+        if S_ISDIR(st.st_mode):
             return {
                 "status": "error",
-                "error": f"Path is a directory, not a file: {path_obj}",
+                "error": f"Path is a directory, not a file: {path}",
                 "output": ""
             }
         
         try:
-            path_obj.unlink()
+            os.unlink(path)
             return {
                 "status": "success",
-                "output": f"Deleted file: {path_obj}"
+                "output": f"Deleted file: {path}"
             }
         except PermissionError:
             return {
                 "status": "error",
-                "error": f"Permission denied deleting file: {path_obj}",
+                "error": f"Permission denied deleting file: {path}",
                 "output": ""
             }
-        except Exception as e:
+        except OSError as e:
             return {
                 "status": "error",
-                "error": f"Could not delete file {path_obj}: {str(e)}",
+                "error": f"Could not delete file {path}: {str(e)}",
                 "output": str(e)
             }
     
-    async def _get_file_info(self, path_obj: Path) -> Dict[str, Any]:
+    def _get_file_info(self, path: str) -> Dict[str, Any]:
         """Get file information."""
-        if not path_obj.exists():
+        st = self._stat(path)
+        if st is None:
             return {
                 "status": "error",
-                "error": f"Path does not exist: {path_obj}",
+                "error": f"Path does not exist: {path}",
                 "output": ""
             }
         
         try:
-            stat = path_obj.stat()
             info = {
-                "path": str(path_obj),
+                "path": path,
                 "exists": True,
-                "is_file": path_obj.is_file(),
-                "is_dir": path_obj.is_dir(),
-                "size": stat.st_size,
-                "modified": stat.st_mtime,
-                "permissions": oct(stat.st_mode)[-3:]
+                "is_file": S_ISREG(st.st_mode),
+                "is_dir": S_ISDIR(st.st_mode),
+                "size": st.st_size,
+                "modified": st.st_mtime,
+                "permissions": oct(st.st_mode)[-3:]
             }
             
             return {
                 "status": "success",
                 "info": info,
-                "output": f"Info for {path_obj}"
+                "output": f"Info for {path}"
             }
         except PermissionError:
             return {
                 "status": "error",
-                "error": f"Permission denied accessing file: {path_obj}",
+                "error": f"Permission denied accessing file: {path}",
                 "output": ""
             }
-        except Exception as e:
+        except OSError as e:
             return {
                 "status": "error",
-                "error": f"Could not get info for {path_obj}: {str(e)}",
+                "error": f"Could not get info for {path}: {str(e)}",
                 "output": str(e)
             }
     
-    async def _check_exists(self, path_obj: Path) -> Dict[str, Any]:
+    def _check_exists(self, path: str) -> Dict[str, Any]:
         """Check if path exists."""
-        exists = path_obj.exists()
+        st = self._stat(path)
+        exists = st is not None
         return {
             "status": "success",
             "exists": exists,
-            "output": f"Path {path_obj} {'exists' if exists else 'does not exist'}",
-            "is_file": path_obj.is_file() if exists else False,
-            "is_dir": path_obj.is_dir() if exists else False
+            "output": f"Path {path} {'exists' if exists else 'does not exist'}",
+            "is_file": S_ISREG(st.st_mode) if exists else False,
+            "is_dir": S_ISDIR(st.st_mode) if exists else False
         }
     
-    def requires_confirmation(self) -> bool:
+    def requires_confirmation(self, operation: Optional[str] = None, **kwargs) -> bool:
         """Check if file operations require confirmation."""
-        # Operations that modify or delete files should require confirmation
-        # This is handled by checking the specific operation during execution
-        return True
+        # Read-only operations are safe to run without prompting; anything that
+        # modifies or deletes files, or an unspecified operation, needs confirmation
+        return operation not in _READ_ONLY_OPS
     
     def _log_execution(self, tool_name: str, details: Dict[str, Any], start_time: float, status: str = "started"):
         """Log tool execution to file for transparency."""
-        log_dir = Path.home() / ".orby" / "logs"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        log_file = log_dir / f"tool_execution_{datetime.now().strftime('%Y-%m-%d')}.log"
-        
-        try:
-            with open(log_file, 'a') as f:
-                timestamp = datetime.now().isoformat()
-                log_entry = f"[{timestamp}] {status.upper()} - {tool_name}: {details}\n"
-                f.write(log_entry)
-        except Exception:
-            # If logging fails, continue execution
-            pass
\ No newline at end of file
+        execution_log.write(tool_name, details, status)
\ No newline at end of file
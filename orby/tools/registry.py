@@ -3,9 +3,14 @@ import subprocess
 import sys
 import os
 import importlib.util
+import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Type, Union
 from pathlib import Path
+from ..utils.command import split_simple_command
+
+# Classes marked with @register_tool by the plugin file currently being imported
+_REGISTERED: List[type] = []
 
 
 class Tool(ABC):
@@ -29,6 +34,58 @@ class Tool(ABC):
         pass
 
 
+# Builtins available to PythonTool code
+_RESTRICTED_BUILTINS = {
+    "__import__": __import__,
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "bool": bool,
+    "chr": chr,
+    "complex": complex,
+    "dict": dict,
+    "dir": dir,
+    "divmod": divmod,
+    "enumerate": enumerate,
+    "filter": filter,
+    "float": float,
+    "format": format,
+    "frozenset": frozenset,
+    "hex": hex,
+    "int": int,
+    "isinstance": isinstance,
+    "issubclass": issubclass,
+    "len": len,
+    "list": list,
+    "map": map,
+    "max": max,
+    "min": min,
+    "object": object,
+    "oct": oct,
+    "ord": ord,
+    "pow": pow,
+    "range": range,
+    "repr": repr,
+    "reversed": reversed,
+    "round": round,
+    "set": set,
+    "slice": slice,
+    "sorted": sorted,
+    "str": str,
+    "sum": sum,
+    "tuple": tuple,
+    "type": type,
+    "zip": zip,
+    "print": print
+}
+
+
+def register_tool(cls: Type[Tool]) -> Type[Tool]:
+    """Class decorator marking a plugin's Tool subclass for registration."""
+    _REGISTERED.append(cls)
+    return cls
+
+
 class PythonTool(Tool):
     """Tool to execute Python code."""
     
@@ -45,49 +102,8 @@ class PythonTool(Tool):
         try:
             # Create a restricted environment for code execution
             local_vars = {}
-            global_vars = {"__builtins__": {
-                "__import__": __import__,
-                "abs": abs,
-                "all": all,
-                "any": any,
-                "bool": bool,
-                "chr": chr,
-                "complex": complex,
-                "dict": dict,
-                "dir": dir,
-                "divmod": divmod,
-                "enumerate": enumerate,
-                "filter": filter,
-                "float": float,
-                "format": format,
-                "frozenset": frozenset,
-                "hex": hex,
-                "int": int,
-                "isinstance": isinstance,
-                "issubclass": issubclass,
-                "len": len,
-                "list": list,
-                "map": map,
-                "max": max,
-                "min": min,
-                "object": object,
-                "oct": oct,
-                "ord": ord,
-                "pow": pow,
-                "range": range,
-                "repr": repr,
-                "reversed": reversed,
-                "round": round,
-                "set": set,
-                "slice": slice,
-                "sorted": sorted,
-                "str": str,
-                "sum": sum,
-                "tuple": tuple,
-                "type": type,
-                "zip": zip,
-                "print": print
-            }}
+            # Fresh copies so one snippet cannot alter what the next one sees
+            global_vars = {"__builtins__": _RESTRICTED_BUILTINS.copy()}
             
             exec(code, global_vars, local_vars)
             
@@ -118,13 +134,22 @@ class ShellTool(Tool):
     def execute(self, command: str, **kwargs) -> Dict[str, Any]:
         """Execute a shell command."""
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
+            run_kwargs = dict(
                 capture_output=True,
                 text=True,
                 timeout=kwargs.get('timeout', 30)
             )
+            result = None
+            argv = split_simple_command(command)
+            if argv is not None:
+                # Simple commands skip the extra /bin/sh fork
+                try:
+                    result = subprocess.run(argv, **run_kwargs)
+                except OSError:
+                    # e.g. a script without a shebang line, which sh still runs
+                    result = None
+            if result is None:
+                result = subprocess.run(command, shell=True, **run_kwargs)
             
             return {
                 "success": result.returncode == 0,
@@ -255,64 +280,149 @@ class FilesystemTool(Tool):
 class ToolRegistry:
     """Registry for managing tools."""
     
+    # Per-file record of the tool names each plugin provided, keyed by path
+    DISCOVERY_CACHE = ".discovery_cache.json"
+    
+    # Built-in tool classes by name, instantiated on first lookup
+    BUILTIN_TOOLS: Dict[str, Type[Tool]] = {
+        "python": PythonTool,
+        "shell": ShellTool,
+        "web": WebTool,
+        "filesystem": FilesystemTool
+    }
+    
     def __init__(self):
-        self._tools: Dict[str, Tool] = {}
+        self._tools: Dict[str, Union[Tool, Type[Tool]]] = {}
+        # Plugin tools known from the discovery cache but not imported yet
+        self._lazy_tools: Dict[str, str] = {}
         self._load_builtin_tools()
         self._load_plugin_tools()
     
     def _load_builtin_tools(self):
-        """Load built-in tools."""
-        builtin_tools = [
-            PythonTool(),
-            ShellTool(),
-            WebTool(),
-            FilesystemTool()
-        ]
-        
-        for tool in builtin_tools:
-            self._tools[tool.name] = tool
+        """Register built-in tools without instantiating them."""
+        self._tools.update(self.BUILTIN_TOOLS)
     
     def _load_plugin_tools(self):
-        """Load tools from the plugins directory."""
+        """Load tools from the plugins directory, deferring unchanged files."""
         # Look for tools in ~/.orby/tools/
         tools_dir = Path.home() / ".orby" / "tools"
         
-        if tools_dir.exists():
-            for file_path in tools_dir.glob("*.py"):
-                self._load_tools_from_file(file_path)
+        try:
+            with os.scandir(tools_dir) as entries:
+                manifest = {
+                    entry.path: entry.stat()
+                    for entry in entries
+                    if entry.name.endswith(".py") and entry.is_file()
+                }
+        except OSError:
+            return
+        
+        cache_path = tools_dir / self.DISCOVERY_CACHE
+        cache = self._read_discovery_cache(cache_path)
+        updated = {}
+        for file_path, st in manifest.items():
+            cached = cache.get(file_path)
+            if cached and cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+                # Unchanged since last discovery: import only when one of its tools is used
+                names = cached.get("tools", [])
+                for name in names:
+                    self._lazy_tools[name] = file_path
+            else:
+                names = self._load_tools_from_file(Path(file_path))
+                if names is None:
+                    # Not cached, so a plugin that failed to import is retried next time
+                    continue
+            updated[file_path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "tools": names}
+        
+        if updated != cache:
+            self._write_discovery_cache(cache_path, updated)
+    
+    @staticmethod
+    def _read_discovery_cache(cache_path: Path) -> Dict[str, Any]:
+        """Read the discovery cache, treating a missing or corrupt file as empty."""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _write_discovery_cache(cache_path: Path, cache: Dict[str, Any]):
+        """Atomically replace the discovery cache."""
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # The cache is only an optimization; discovery reruns next time
+            pass
+    
+    def _load_tools_from_file(self, file_path: Path) -> Optional[List[str]]:
+        """Load tools from a Python file, returning the names registered or None if it failed to import."""
+        tools = self._import_tools(file_path)
+        if tools is None:
+            return None
+        names = []
+        for tool in tools:
+            self._tools[tool.name] = tool
+            self._lazy_tools.pop(tool.name, None)
+            names.append(tool.name)
+        return names
     
-    def _load_tools_from_file(self, file_path: Path):
-        """Load tools from a Python file."""
+    def _import_tools(self, file_path: Path) -> Optional[List[Tool]]:
+        """Import a plugin file and instantiate the Tool subclasses it defines, or None if the import fails."""
+        tools = []
         try:
             spec = importlib.util.spec_from_file_location("tools_module", file_path)
             module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            _REGISTERED.clear()
+            try:
+                spec.loader.exec_module(module)
+                registered = list(_REGISTERED)
+            finally:
+                _REGISTERED.clear()
             
-            # Look for Tool subclasses in the module
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if (
-                    isinstance(attr, type) and 
-                    issubclass(attr, Tool) and 
-                    attr != Tool
-                ):
-                    try:
-                        tool_instance = attr()
-                        self._tools[tool_instance.name] = tool_instance
-                    except Exception:
-                        # Skip tools that can't be instantiated
-                        continue
+            if not registered:
+                # Undecorated plugin: look for Tool subclasses in the module
+                registered = [
+                    attr for _, attr in sorted(vars(module).items())
+                    if isinstance(attr, type) and issubclass(attr, Tool) and attr is not Tool
+                ]
+            
+            for cls in registered:
+                try:
+                    tools.append(cls())
+                except Exception:
+                    # Skip tools that can't be instantiated
+                    continue
         except Exception:
             # If there's an error loading the plugin, skip it
-            pass
+            return None
+        return tools
+    
+    def _load_lazy_file(self, file_path: str):
+        """Import a deferred plugin file and register the tools still attributed to it."""
+        for tool in self._import_tools(Path(file_path)) or []:
+            if self._lazy_tools.get(tool.name) == file_path:
+                self._tools[tool.name] = tool
+        for name in [n for n, p in self._lazy_tools.items() if p == file_path]:
+            del self._lazy_tools[name]
     
     def get_tool(self, name: str) -> Tool:
         """Get a tool by name."""
-        return self._tools.get(name)
+        file_path = self._lazy_tools.get(name)
+        if file_path is not None:
+            self._load_lazy_file(file_path)
+        tool = self._tools.get(name)
+        if isinstance(tool, type):
+            tool = self._tools[name] = tool()
+        return tool
     
     def list_tools(self) -> List[str]:
         """List all available tool names."""
-        return list(self._tools.keys())
+        return list(dict.fromkeys([*self._tools, *self._lazy_tools]))
     
     def execute_tool(self, name: str, **kwargs) -> Dict[str, Any]:
         """Execute a tool by name with given parameters."""
@@ -1,26 +1,42 @@
 """Enhanced shell tool for Orby with sandboxing and permissions."""
-import subprocess
+import asyncio
 import sys
 import os
 import tempfile
 import shutil
+import signal
 import time
-from pathlib import Path
 from typing import Dict, Any
-from datetime import datetime
 import logging
 from ..core import Tool, ToolPermission
+from .execution_log import execution_log
+from ..utils.command import split_simple_command
+from ..utils.patterns import compile_literals
 
 
 class ShellTool(Tool):
     """Enhanced tool to execute shell commands with sandboxing and permissions."""
     
+    _DANGER_RE = compile_literals([
+        'rm -rf', 'rm -r', 'rm -f', 'rmdir', '/dev/',
+        'mkfs', 'dd if=', '>/dev/',
+        'chmod 777', 'chmod -R 777',
+        'chown -R root', 'passwd', 'shadow',
+        'sudo', 'su root', 'visudo',
+        'iptables', 'ufw', 'firewall',
+        'mount', 'umount', 'fdisk',
+        'reboot', 'shutdown', 'halt',
+        'kill -9', 'pkill -f'
+    ])
+    
     def __init__(self):
         super().__init__(
             name="shell",
             description="Execute shell commands in a secure environment with logging",
             permissions_required=["execute", "shell"]
         )
+        # Restricted environment for executed commands, built once per tool
+        self._env = {k: v for k, v in os.environ.items() if k.startswith(('PATH', 'HOME', 'USER'))}
 
     async def execute(self, command: str, timeout: int = 30, **kwargs) -> Dict[str, Any]:
         """Execute a shell command with security and logging."""
@@ -43,35 +59,56 @@ class ShellTool(Tool):
                 }
             
             # Execute the command
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
+            popen_kwargs = dict(
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                # Own process group so a timeout can kill the shell's children too
+                start_new_session=hasattr(os, "killpg"),
                 # Restrict environment variables for security
-                env={k: v for k, v in os.environ.items() if k.startswith(('PATH', 'HOME', 'USER'))}
+                env=self._env
             )
+            proc = None
+            argv = split_simple_command(command, self._env.get("PATH", os.defpath))
+            if argv is not None:
+                # Simple commands skip the extra /bin/sh fork
+                try:
+                    proc = await asyncio.create_subprocess_exec(*argv, **popen_kwargs)
+                except OSError:
+                    # e.g. a script without a shebang line, which sh still runs
+                    proc = None
+            if proc is None:
+                proc = await asyncio.create_subprocess_shell(command, **popen_kwargs)
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if hasattr(os, "killpg"):
+                    os.killpg(proc.pid, signal.SIGKILL)
+                else:
+                    proc.kill()
+                await proc.wait()
+                raise
+            stdout = stdout.decode(errors="replace")
+            stderr = stderr.decode(errors="replace")
             
             execution_time = time.time() - start_time
             
             # Log successful execution
             self._log_execution("shell", {
                 "command": command, 
-                "return_code": result.returncode,
+                "return_code": proc.returncode,
                 "execution_time": execution_time
             }, start_time, "completed")
             
             return {
                 "status": "success",
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "return_code": result.returncode,
-                "output": result.stdout + result.stderr,
+                "stdout": stdout,
+                "stderr": stderr,
+                "return_code": proc.returncode,
+                "output": stdout + stderr,
                 "execution_time": execution_time
             }
             
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             execution_time = time.time() - start_time
             self._log_execution("shell", {"command": command, "timeout": True}, start_time, "timeout")
             
@@ -94,26 +131,12 @@ class ShellTool(Tool):
 
     def _validate_command(self, command: str) -> Dict[str, Any]:
         """Validate command for safety."""
-        dangerous_patterns = [
-            'rm -rf', 'rm -r', 'rm -f', 'rmdir', '/dev/',
-            'mkfs', 'dd if=', '>/dev/',
-            'chmod 777', 'chmod -R 777',
-            'chown -R root', 'passwd', 'shadow',
-            'sudo', 'su root', 'visudo',
-            'iptables', 'ufw', 'firewall',
-            'mount', 'umount', 'fdisk',
-            'reboot', 'shutdown', 'halt',
-            'kill -9', 'pkill -f'
-        ]
-        
-        cmd_lower = command.lower()
-        
-        for pattern in dangerous_patterns:
-            if pattern in cmd_lower:
-                return {
-                    "blocked": True,
-                    "message": f"Command contains potentially dangerous operation: {pattern}"
-                }
+        match = self._DANGER_RE.search(command)
+        if match:
+            return {
+                "blocked": True,
+                "message": f"Command contains potentially dangerous operation: {match.group(0)}"
+            }
         
         # Check for path traversal attempts
         if '..' in command and ('/' in command or ';' in command):
@@ -124,22 +147,10 @@ class ShellTool(Tool):
         
         return {"blocked": False, "message": ""}
     
-    def requires_confirmation(self) -> bool:
+    def requires_confirmation(self, **kwargs) -> bool:
         """Check if shell execution requires user confirmation (it's dangerous)."""
         return True
     
     def _log_execution(self, tool_name: str, details: Dict[str, Any], start_time: float, status: str = "started"):
         """Log tool execution to file for transparency."""
-        log_dir = Path.home() / ".orby" / "logs"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        log_file = log_dir / f"tool_execution_{datetime.now().strftime('%Y-%m-%d')}.log"
-        
-        try:
-            with open(log_file, 'a') as f:
-                timestamp = datetime.now().isoformat()
-                log_entry = f"[{timestamp}] {status.upper()} - {tool_name}: {details}\n"
-                f.write(log_entry)
-        except Exception:
-            # If logging fails, continue execution
-            pass
\ No newline at end of file
+        execution_log.write(tool_name, details, status)
\ No newline at end of file
@@ -2,11 +2,17 @@
 from ..tools import Tool
 from typing import Dict, Any
 import base64
+import contextlib
 from PIL import Image
 import io
 import os
 from pathlib import Path
 
+# Operations that only need the header-level properties PIL reads on open
+_METADATA_OPS = frozenset({"describe", "analyze"})
+# Base64 characters decoded when probing a payload's header (48 KiB of bytes)
+_HEADER_PROBE_CHARS = 64 * 1024
+
 
 class VisionTool(Tool):
     """Tool to process images and screenshots with local vision models."""
@@ -19,14 +25,23 @@ class VisionTool(Tool):
         self.supported_formats = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff'}
     
     async def execute(self, image_path: str = None, image_data: str = None, 
-                     operation: str = "describe", **kwargs) -> Dict[str, Any]:
-        """Process an image."""
+                     operation: str = "describe", image_bytes: bytes = None,
+                     image_obj: Image.Image = None, **kwargs) -> Dict[str, Any]:
+        """Process an image given as a PIL image, raw bytes, base64 data or a path."""
         try:
             # Load image
-            if image_data:
-                # Image data is base64 encoded
-                image_bytes = base64.b64decode(image_data)
+            if image_obj is not None:
+                # Already decoded by the caller
+                image = image_obj
+            elif image_bytes is not None:
                 image = Image.open(io.BytesIO(image_bytes))
+            elif image_data:
+                # Image data is base64 encoded
+                image = None
+                if operation in _METADATA_OPS:
+                    image = self._open_header(image_data)
+                if image is None:
+                    image = Image.open(io.BytesIO(base64.b64decode(image_data)))
             elif image_path:
                 # Load from file path
                 if not os.path.exists(image_path):
@@ -53,27 +68,30 @@ class VisionTool(Tool):
                     "output": ""
                 }
             
-            # Process based on operation
-            if operation == "describe":
-                result = self._describe_image(image)
-            elif operation == "ocr":
-                result = self._extract_text(image)
-            elif operation == "analyze":
-                result = self._analyze_image(image)
-            else:
+            # Release the file handle PIL keeps open for lazy loading,
+            # but leave a caller's image open
+            with image if image_obj is None else contextlib.nullcontext(image):
+                # Process based on operation
+                if operation == "describe":
+                    result = self._describe_image(image)
+                elif operation == "ocr":
+                    result = self._extract_text(image)
+                elif operation == "analyze":
+                    result = self._analyze_image(image)
+                else:
+                    return {
+                        "status": "error",
+                        "error": f"Unsupported operation: {operation}",
+                        "output": ""
+                    }
+                
                 return {
-                    "status": "error",
-                    "error": f"Unsupported operation: {operation}",
-                    "output": ""
+                    "status": "success",
+                    "analysis": result,
+                    "image_format": image.format,
+                    "image_size": image.size,
+                    "output": f"Image processed successfully: {result}"
                 }
-            
-            return {
-                "status": "success",
-                "analysis": result,
-                "image_format": image.format,
-                "image_size": image.size,
-                "output": f"Image processed successfully: {result}"
-            }
         except Exception as e:
             return {
                 "status": "error",
@@ -81,6 +99,18 @@ class VisionTool(Tool):
                 "output": str(e)
             }
     
+    @staticmethod
+    def _open_header(image_data: str):
+        """Open an image from just the start of a base64 payload, or None if that isn't enough."""
+        if len(image_data) <= _HEADER_PROBE_CHARS:
+            return None
+        try:
+            # Image.open parses headers only; pixels are never decoded here
+            return Image.open(io.BytesIO(base64.b64decode(image_data[:_HEADER_PROBE_CHARS])))
+        except Exception:
+            # Header runs past the probe (e.g. large EXIF) or the slice isn't valid base64
+            return None
+    
     def _describe_image(self, image: Image.Image) -> str:
         """Generate a description of the image."""
         # In a real implementation, this would use a vision model
@@ -18,11 +18,14 @@ class VoiceTool(Tool):
         self.supported_formats = {'.wav', '.mp3', '.flac', '.m4a', '.ogg'}
     
     async def execute(self, audio_path: str = None, audio_data: str = None, 
-                      language: str = "en-US", **kwargs) -> Dict[str, Any]:
-        """Process audio and transcribe speech."""
+                      language: str = "en-US", audio_bytes: bytes = None, **kwargs) -> Dict[str, Any]:
+        """Process audio given as raw bytes, base64 data or a path, and transcribe speech."""
         try:
             # Load audio
-            if audio_data:
+            if audio_bytes is not None:
+                # Already decoded by the caller; in a real implementation, we'd process them
+                transcription = "Audio transcription functionality not implemented in this demo."
+            elif audio_data:
                 # Audio data is base64 encoded
                 audio_bytes = base64.b64decode(audio_data)
                 # In a real implementation, we'd process the audio bytes
@@ -1,11 +1,11 @@
 """Enhanced web operations for Orby."""
+import asyncio
 import aiohttp
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, Optional
 import time
 import urllib.parse
-from pathlib import Path
 from ..core import Tool
+from .execution_log import execution_log
 
 
 class WebTool(Tool):
@@ -17,6 +17,54 @@ class WebTool(Tool):
             description="Fetch web content and perform web operations safely",
             permissions_required=["network", "web"]
         )
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_guard = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session, creating it for the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            await self._release_session()
+            self._session_loop = loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=30),
+                headers={"Accept-Encoding": "gzip, deflate"}
+            )
+            # Callers such as chat.py run each message under its own asyncio.run;
+            # this keeps the session tied to its loop and closed when that loop shuts down
+            self._session_guard = self._close_at_loop_shutdown(self._session)
+            await self._session_guard.__anext__()
+        return self._session
+    
+    @staticmethod
+    async def _close_at_loop_shutdown(session: aiohttp.ClientSession):
+        """Stay suspended until finalized (loop.shutdown_asyncgens() or aclose()), then close the session."""
+        try:
+            yield
+        finally:
+            await session.close()
+    
+    async def _release_session(self):
+        """Close the current session, which may belong to another event loop."""
+        guard, loop = self._session_guard, self._session_loop
+        self._session = self._session_loop = self._session_guard = None
+        if guard is None:
+            return
+        try:
+            if loop is not asyncio.get_running_loop() and loop.is_running():
+                # Still alive in another thread; close it there
+                asyncio.run_coroutine_threadsafe(guard.aclose(), loop)
+            else:
+                # Already closed if its loop shut down its async generators
+                await guard.aclose()
+        except Exception:
+            # The session is unusable either way; don't fail the new request
+            pass
+    
+    async def close(self):
+        """Close the pooled HTTP session."""
+        await self._release_session()
 
     async def execute(self, operation: str, url: str, **kwargs) -> Dict[str, Any]:
         """Execute web operations with safety and logging."""
@@ -72,39 +120,49 @@ class WebTool(Tool):
     async def _fetch_url(self, url: str, timeout: int = 30, max_size: int = 10*1024*1024, **kwargs) -> Dict[str, Any]:
         """Fetch content from a URL with safety limits."""
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=timeout)
-            ) as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
+            session = await self._get_session()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status != 200:
+                    return {
+                        "status": "error",
+                        "error": f"HTTP {response.status}: {response.reason}",
+                        "status_code": response.status,
+                        "output": ""
+                    }
+                    
+                # Refuse early when the server already says the body is too big
+                if response.content_length is not None and response.content_length > max_size:
+                    return {
+                        "status": "error",
+                        "error": f"Content too large (>{max_size} bytes)",
+                        "output": f"Server reported {response.content_length} bytes"
+                    }
+                
+                # Read content with size limit, decoding once at the end so
+                # multi-byte characters split across chunks survive
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(65536):
+                    body.extend(chunk)
+                    
+                    if len(body) > max_size:
                         return {
                             "status": "error",
-                            "error": f"HTTP {response.status}: {response.reason}",
-                            "status_code": response.status,
-                            "output": ""
+                            "error": f"Content too large (>{max_size} bytes)",
+                            "output": f"Stopped at {len(body)} bytes due to size limit"
                         }
+                
+                try:
+                    content = body.decode(response.charset or 'utf-8', errors='replace')
+                except LookupError:
+                    content = body.decode('utf-8', errors='replace')
                     
-                    # Read content with size limit
-                    content = ""
-                    size = 0
-                    async for chunk in response.content.iter_chunked(8192):
-                        content += chunk.decode('utf-8', errors='ignore')
-                        size += len(chunk)
-                        
-                        if size > max_size:
-                            return {
-                                "status": "error",
-                                "error": f"Content too large (>{max_size} bytes)",
-                                "output": f"Stopped at {size} bytes due to size limit"
-                            }
-                    
-                    return {
-                        "status": "success",
-                        "content": content,
-                        "status_code": response.status,
-                        "content_length": len(content),
-                        "output": f"Fetched {len(content)} characters from {url}"
-                    }
+                return {
+                    "status": "success",
+                    "content": content,
+                    "status_code": response.status,
+                    "content_length": len(content),
+                    "output": f"Fetched {len(content)} characters from {url}"
+                }
         except asyncio.TimeoutError:
             return {
                 "status": "error",
@@ -121,20 +179,18 @@ class WebTool(Tool):
     async def _head_request(self, url: str, timeout: int = 30, **kwargs) -> Dict[str, Any]:
         """Make a HEAD request to get URL metadata."""
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=timeout)
-            ) as session:
-                async with session.head(url) as response:
-                    headers = dict(response.headers)
+            session = await self._get_session()
+            async with session.head(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                headers = dict(response.headers)
                     
-                    return {
-                        "status": "success",
-                        "status_code": response.status,
-                        "headers": headers,
-                        "content_type": headers.get('Content-Type', ''),
-                        "content_length": headers.get('Content-Length', ''),
-                        "output": f"HEAD request to {url} returned {response.status}"
-                    }
+                return {
+                    "status": "success",
+                    "status_code": response.status,
+                    "headers": headers,
+                    "content_type": headers.get('Content-Type', ''),
+                    "content_length": headers.get('Content-Length', ''),
+                    "output": f"HEAD request to {url} returned {response.status}"
+                }
         except Exception as e:
             return {
                 "status": "error",
@@ -177,26 +233,10 @@ class WebTool(Tool):
                 "error": "Invalid URL format"
             }
     
-    def requires_confirmation(self) -> bool:
+    def requires_confirmation(self, **kwargs) -> bool:
         """Web access requires confirmation as it involves network operations."""
         return True
     
     def _log_execution(self, tool_name: str, details: Dict[str, Any], start_time: float, status: str = "started"):
         """Log tool execution to file for transparency."""
-        log_dir = Path.home() / ".orby" / "logs"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        log_file = log_dir / f"tool_execution_{datetime.now().strftime('%Y-%m-%d')}.log"
-        
-        try:
-            with open(log_file, 'a') as f:
-                timestamp = datetime.now().isoformat()
-                log_entry = f"[{timestamp}] {status.upper()} - {tool_name}: {details}\n"
-                f.write(log_entry)
-        except Exception:
-            # If logging fails, continue execution
-            pass
-
-
-# Import asyncio for timeout handling
-import asyncio
\ No newline at end of file
+        execution_log.write(tool_name, details, status)
@@ -13,7 +13,7 @@ from datetime import datetime
 import asyncio
 from typing import Optional
 from ..core import OrbyApp
-from ..memory import memory_system
+from ..memory import get_memory_system
 from ..config import load_config
 from ..prompt_manager import PromptManager
 from ..ui.enhanced_ui import ui as enhanced_ui
@@ -120,6 +120,7 @@ class OrbyTUI(App):
     
     def action_toggle_memory(self) -> None:
         """Toggle memory functionality."""
+        memory_system = get_memory_system()
         memory_system.set_memory_enabled(not memory_system.memory_enabled)
         self.notify(f"Memory {'enabled' if memory_system.memory_enabled else 'disabled'}")
     
@@ -251,7 +252,7 @@ class OrbyStatusPanel(Static):
         model = self.config.get('default_model', 'llama3.1:latest')
         profile = self.config.get('profile', 'default') 
         backend = self.config.get('default_backend', 'ollama')
-        memory_enabled = memory_system.memory_enabled
+        memory_enabled = get_memory_system().memory_enabled
         system_prompt = self.prompt_manager.load_system_prompt()
         
         # Update widgets
@@ -284,11 +285,11 @@ class OrbyMemoryPanel(Static):
     def update_memory_stats(self) -> None:
         """Update memory statistics."""
         try:
-            stats = memory_system.get_memory_stats()
+            stats = get_memory_system().get_memory_stats()
             
             ephemeral = stats.get('ephemeral_entries', 0)
             persistent = stats.get('persistent_entries', 0)
-            context = memory_system.get_context(max_entries=5)  # Get last 5 entries for context preview
+            context = get_memory_system().get_context(max_entries=5)  # Get last 5 entries for context preview
             
             self.query_one("#ephemeral-count", Static).update(f"Ephemeral: [b]{ephemeral}[/b] entries")
             self.query_one("#persistent-count", Static).update(f"Persistent: [b]{persistent}[/b] entries")
@@ -388,6 +389,7 @@ class OrbyConversationPane(Static):
         
         # Add to memory system
         try:
+            memory_system = get_memory_system()
             if hasattr(memory_system, 'add_to_session_memory'):
                 memory_system.add_to_session_memory(
                     content=content,
@@ -481,7 +483,7 @@ class OrbyToolsPane(Static):
                 child.remove()
             
             # Get recent memory entries
-            context = memory_system.get_context(max_entries=10)
+            context = get_memory_system().get_context(max_entries=10)
             
             if context.strip():
                 # Split context into lines and add each as a separate widget
@@ -0,0 +1,38 @@
+"""Helpers for running user commands without an intermediate shell."""
+import shlex
+import shutil
+from typing import List, Optional
+
+# Characters that need the shell: operators, redirection, expansions, escapes,
+# comments and line breaks. Plain quoting is left to shlex, which splits it the
+# same way sh does once $, ` and \ are ruled out.
+_SHELL_META = frozenset(";&|<>()`$*?[]{}~#\\\n\r")
+
+# Builtins and keywords whose effect depends on running inside the shell
+_SHELL_BUILTINS = frozenset({
+    ".", "alias", "bg", "cd", "command", "eval", "exec", "exit", "export",
+    "fg", "getopts", "hash", "jobs", "local", "read", "readonly", "return",
+    "set", "shift", "source", "times", "trap", "type", "ulimit", "umask",
+    "unalias", "unset", "wait"
+})
+
+
+def split_simple_command(command: str, path: Optional[str] = None) -> Optional[List[str]]:
+    """Split a command into argv when exec'ing it directly behaves like `sh -c`, else None.
+
+    ``path`` is the PATH the command will run with; None means os.environ's.
+    """
+    if not _SHELL_META.isdisjoint(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        # Unbalanced quotes; let the shell report it
+        return None
+    # Assignments, builtins and unknown commands keep the shell's behaviour and errors
+    if (
+        not argv or "=" in argv[0] or argv[0] in _SHELL_BUILTINS or
+        shutil.which(argv[0], path=path) is None
+    ):
+        return None
+    return argv
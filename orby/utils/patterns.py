@@ -0,0 +1,28 @@
+"""Fast matching of fixed substrings for Orby's safety checks."""
+import re
+from typing import Any, Dict, Iterable, Pattern
+
+
+def _trie_regex(node: Dict[str, Any]) -> str:
+    """Render a character trie as a regex body, longest alternative first."""
+    branches = [re.escape(char) + _trie_regex(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # A word ending here makes the rest optional; greedy matching still prefers the longer word
+    return f"(?:{body})?" if "" in node else body
+
+
+def compile_literals(words: Iterable[str]) -> Pattern[str]:
+    """Compile case-insensitive substrings into one trie-shaped regex.
+
+    Unlike a flat "a|b|c" alternation, each position in the searched text is
+    dispatched on its next character instead of trying every word in turn.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[""] = True
+    return re.compile(_trie_regex(trie), re.IGNORECASE)